@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from ai.timings import record_timing, timed
+
+MODEL_POOL_WORKERS = int(os.environ.get("MODEL_POOL_WORKERS", "8"))
+MODEL_POOL_QUEUE = int(os.environ.get("MODEL_POOL_QUEUE", "32"))
+IO_POOL_WORKERS = int(os.environ.get("IO_POOL_WORKERS", "16"))
+IO_POOL_QUEUE = int(os.environ.get("IO_POOL_QUEUE", "64"))
+RETRY_AFTER_SECONDS = int(os.environ.get("RETRY_AFTER_SECONDS", "2"))
+
+
+class StageOverloaded(Exception):
+    def __init__(self, stage: str, retry_after: int) -> None:
+        super().__init__(f"Stage '{stage}' is at capacity, retry in {retry_after}s")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+class BoundedStage:
+    def __init__(self, name: str, executor: ThreadPoolExecutor, max_pending: int, retry_after: int = RETRY_AFTER_SECONDS) -> None:
+        self.name = name
+        self.executor = executor
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise StageOverloaded(self.name, self.retry_after)
+            self._pending += 1
+        submitted = time.perf_counter()
+
+        def call() -> Any:
+            record_timing(f"{self.name}_wait", time.perf_counter() - submitted)
+            return fn(*args, **kwargs)
+
+        ctx = contextvars.copy_context()
+        try:
+            future = self.executor.submit(ctx.run, call)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        with timed(self.name):
+            return await asyncio.wrap_future(future)
+
+
+model_executor = ThreadPoolExecutor(max_workers=MODEL_POOL_WORKERS, thread_name_prefix="model")
+io_executor = ThreadPoolExecutor(max_workers=IO_POOL_WORKERS, thread_name_prefix="io")
+
+classify_stage = BoundedStage("classify", model_executor, MODEL_POOL_WORKERS + MODEL_POOL_QUEUE)
+tool_stage = BoundedStage("tool", io_executor, IO_POOL_WORKERS + IO_POOL_QUEUE)
+
+
+def shutdown_executors() -> None:
+    model_executor.shutdown(wait=False, cancel_futures=True)
+    io_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "agent.main",
+    "ai.nlp_engine",
+    "ai.decision",
+    "tools.tool_registry",
+    "tools.gmail_tool",
+    "tools.google_calendar_tool",
+    "tools.google_tasks_tool",
+    "tools.web_search_tool",
+    "tools.revolut_tool",
+]
+
+
+def measure_import(module: str, top: int = 5) -> Dict[str, Any]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    total_us = next((cumulative for name, _, cumulative in entries if name == module), None)
+    slowest = sorted(entries, key=lambda entry: entry[1], reverse=True)[:top]
+    report = {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "cumulative_ms": round(total_us / 1000, 1) if total_us is not None else None,
+        "slowest_self_ms": [{"module": name, "ms": round(self_us / 1000, 1)} for name, self_us, _ in slowest],
+    }
+    if proc.returncode != 0:
+        report["error"] = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"
+    return report
+
+
+def compare(reports: List[Dict[str, Any]], baseline: List[Dict[str, Any]], max_regression: float) -> List[str]:
+    previous = {entry["module"]: entry.get("cumulative_ms") for entry in baseline}
+    regressions = []
+    for entry in reports:
+        before, after = previous.get(entry["module"]), entry.get("cumulative_ms")
+        if before and after and after > before * (1 + max_regression):
+            regressions.append(f"{entry['module']}: {before}ms -> {after}ms")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report per-module import time for the API startup path")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed fractional slowdown per module")
+    args = parser.parse_args()
+
+    reports = [measure_import(module) for module in args.modules]
+    output = json.dumps(reports, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(reports, json.load(f), args.max_regression)
+        if regressions:
+            print("Import time regressions:\n" + "\n".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,85 @@
-from fastapi import FastAPI
+import asyncio
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from agent.executors import StageOverloaded, model_executor, shutdown_executors
 from agent.routes import router as agent_router
+from ai.llm_client import set_llm_client
+from ai.nlp_engine import close_intent_engine, warm_up_models
+from ai.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, METRICS_ENABLED
+from ai.request_context import configure_logging, reset_request_id, set_request_id
+from ai.timings import SERVER_TIMING_ENABLED, current_timings, reset_timings, start_timings
+from db.mongo_client import close_mongo_client
+from db.user_preferences import start_preference_change_listener
+
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "1") == "1"
+
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MODEL_WARMUP:
+        asyncio.get_running_loop().run_in_executor(model_executor, warm_up_models)
+    preferences_listener = start_preference_change_listener()
+    yield
+    if preferences_listener:
+        preferences_listener.set()
+    shutdown_executors()
+    close_intent_engine()
+    set_llm_client(None)
+    close_mongo_client()
+
 
 app = FastAPI(
     title="Orianna Agent",
     version="0.1.0",
-    description="A personal home assistant/agent"
+    description="A personal home assistant/agent",
+    lifespan=lifespan,
 )
 
 app.include_router(agent_router)
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    request_token = set_request_id(request_id)
+    timing_token = start_timings() if SERVER_TIMING_ENABLED else None
+    timings = current_timings()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        if timing_token is not None:
+            reset_timings(timing_token)
+        reset_request_id(request_token)
+        if METRICS_ENABLED:
+            # The route template, not the raw path, keeps label cardinality bounded
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            HTTP_REQUESTS.inc(method=request.method, route=route, status=str(status))
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method, route=route)
+    response.headers["X-Request-ID"] = request_id
+    # Streaming responses send headers before the work is done, so only
+    # stages finished by then are reported.
+    header = timings.header() if timings else ""
+    if header:
+        response.headers["Server-Timing"] = header
+    return response
+
+@app.exception_handler(StageOverloaded)
+async def stage_overloaded_handler(request: Request, exc: StageOverloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"message": str(exc), "stage": exc.stage, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Orianna Agent API"}
@@ -1,19 +1,93 @@
+import asyncio
+import json
 import logging
 from fastapi import APIRouter, Body
-from ai.nlp_engine import process_user_input
-from ai.decision import decide_next_action
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from agent.executors import classify_stage, tool_stage
+from ai.events import emit, reset_event_sink, set_event_sink
+from ai.metrics import METRICS_ENABLED, registry
+from ai.planner import execute_plan, plan_user_input
+from ai.model_status import all_models_ready, get_model_status
+from db.merchant_categories import set_merchant_category_override
 from db.user_preferences import set_user_preference
+from tools.extraction_cache import extraction_cache
+from tools.fast_extraction import extraction_stats
+from tools.tool_registry import get_registry
 
 router = APIRouter()
 
 @router.post("/query")
-def process_command(user_input: str = Body(...)):
-    parsed = process_user_input(user_input)
-    logging.info(f"User input: {user_input} | Intent: {parsed['intent']} | Confidence: {parsed['confidence']}")
-    decision = decide_next_action(parsed)
-    return {"parsed": parsed, "decision": decision}
+async def process_command(user_input: str = Body(...)):
+    plan = await classify_stage.run(plan_user_input, user_input)
+    logging.info(f"User input: {user_input} | Intent: {plan.intent} | Confidence: {plan.confidence} | Steps: {len(plan.steps)}")
+    decision = await execute_plan(plan, tool_stage.run)
+    return {"parsed": plan.parsed, "plan": [step.model_dump() for step in plan.steps], "decision": decision}
+
+@router.post("/query/stream")
+async def process_command_stream(user_input: str = Body(...)):
+    # Classify before the response starts so an overloaded stage still gets a 503
+    plan = await classify_stage.run(plan_user_input, user_input)
+    logging.info(f"User input: {user_input} | Intent: {plan.intent} | Confidence: {plan.confidence} | Steps: {len(plan.steps)}")
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def sink(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    async def run():
+        token = set_event_sink(sink)
+        try:
+            emit("intent", parsed=plan.parsed, plan=[step.model_dump() for step in plan.steps])
+            decision = await execute_plan(plan, tool_stage.run)
+            emit("decision", decision=decision)
+        except Exception as e:
+            logging.error(f"Streaming query failed: {e}")
+            emit("error", message=str(e), retry_after=getattr(e, "retry_after", None))
+        finally:
+            reset_event_sink(token)
+            # Queued behind any events still in flight from worker threads
+            loop.call_soon_threadsafe(events.put_nowait, None)
+
+    task = asyncio.create_task(run())
+
+    async def body():
+        try:
+            while (event := await events.get()) is not None:
+                yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        finally:
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
 
 @router.post("/user_preferences")
 def update_preference(user_id: str, pref_key: str, pref_value: float):
     set_user_preference(user_id, pref_key, pref_value)
     return {"message": "Preference updated!"}
+
+@router.post("/merchant_categories")
+def override_merchant_category(description: str, category: str):
+    set_merchant_category_override(description, category)
+    return {"message": "Merchant category updated!"}
+
+@router.get("/tools")
+def list_tools():
+    registry = get_registry()
+    return {
+        "tools": registry.describe(),
+        "intents": registry.intent_owners(),
+        "extraction": extraction_stats.snapshot(),
+        "extraction_cache": extraction_cache.stats(),
+    }
+
+@router.get("/ready")
+def readiness():
+    ready = all_models_ready()
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, "models": get_model_status()})
+
+@router.get("/metrics")
+def metrics():
+    if not METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"message": "Metrics are disabled (METRICS_ENABLED=0)."})
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
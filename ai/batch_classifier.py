@@ -0,0 +1,138 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import torch
+
+
+class BatchingZeroShotClassifier:
+    def __init__(
+        self,
+        zero_shot_pipeline,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        hypothesis_template: str = "This example is {}.",
+    ) -> None:
+        self.tokenizer = zero_shot_pipeline.tokenizer
+        self.model = zero_shot_pipeline.model
+        self.model.eval()
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.hypothesis_template = hypothesis_template
+        self.entailment_id, self.contradiction_id = self._nli_label_ids(self.model.config.label2id)
+        self._queue: "queue.Queue[Optional[Tuple[str, Tuple[str, ...], Future]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    @staticmethod
+    def _nli_label_ids(label2id: Dict[str, int]) -> Tuple[int, int]:
+        entailment_id = contradiction_id = -1
+        for label, idx in label2id.items():
+            if label.lower().startswith("entail"):
+                entailment_id = idx
+            elif label.lower().startswith("contra"):
+                contradiction_id = idx
+        if entailment_id == -1:
+            raise ValueError("Zero-shot model config has no entailment label")
+        return entailment_id, contradiction_id
+
+    def classify(self, text: str, candidate_labels: Sequence[str], timeout: Optional[float] = None) -> Dict[str, Any]:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, tuple(candidate_labels), future))
+        return future.result(timeout=timeout)
+
+    def classify_many(self, texts: Sequence[str], candidate_labels: Sequence[str], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        self._ensure_worker()
+        futures: List[Future] = []
+        for text in texts:
+            future: Future = Future()
+            self._queue.put((text, tuple(candidate_labels), future))
+            futures.append(future)
+        return [future.result(timeout=timeout) for future in futures]
+
+    def close(self) -> None:
+        with self._worker_lock:
+            if self._worker is not None:
+                self._queue.put(None)
+                self._worker.join()
+                self._worker = None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="zero-shot-batcher", daemon=True)
+                    self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: List[Tuple[str, Tuple[str, ...], Future]]) -> None:
+        batch = [entry for entry in batch if entry[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        premises: List[str] = []
+        hypotheses: List[str] = []
+        for text, labels, _ in batch:
+            for label in labels:
+                premises.append(text)
+                hypotheses.append(self.hypothesis_template.format(label))
+        try:
+            inputs = self.tokenizer(
+                premises,
+                hypotheses,
+                padding=True,
+                truncation="only_first",
+                return_tensors="pt",
+            ).to(self.model.device)
+            with torch.inference_mode():
+                logits = self.model(**inputs).logits.float().cpu()
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for text, labels, future in batch:
+            pair_logits = logits[offset:offset + len(labels)]
+            offset += len(labels)
+            scores = pair_logits[:, self.entailment_id].softmax(dim=0).tolist()
+            ranked = sorted(zip(labels, scores), key=lambda pair: pair[1], reverse=True)
+            future.set_result({
+                "sequence": text,
+                "labels": [label for label, _ in ranked],
+                "scores": [score for _, score in ranked],
+                "multi_label_scores": self._multi_label_scores(labels, pair_logits),
+            })
+
+    def _multi_label_scores(self, labels: Sequence[str], pair_logits) -> Dict[str, float]:
+        # Same as the pipeline's multi_label=True: each label scored on its own
+        # entailment-vs-contradiction softmax, so several labels can be likely at once.
+        if self.contradiction_id == -1:
+            return {}
+        pairs = pair_logits[:, [self.contradiction_id, self.entailment_id]]
+        return dict(zip(labels, pairs.softmax(dim=1)[:, 1].tolist()))
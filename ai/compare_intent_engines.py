@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Dict, List, Set, Tuple
+
+from ai import nlp_engine
+
+PROMPTS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "prompts.txt")
+
+# Acceptable top labels for each single-intent phrasing in prompts.txt.
+EXPECTED_INTENTS: Dict[str, Set[str]] = {
+    "Could you check my Gmail inbox?": {"check email", "list emails"},
+    "Show me the last 3 emails from my Promotions label.": {"list emails", "check email"},
+    "Any unread messages in my Spam folder?": {"check email", "list emails"},
+    "Display the most recent 6 emails from my Social category.": {"list emails", "check email"},
+    "List the top 5 starred emails.": {"list emails", "check email"},
+    "Show me my draft emails.": {"list emails", "check email"},
+    "Fetch my emails.": {"list emails", "check email", "read emails"},
+    "Check if I have any new email from 'Amazon'?": {"check email", "list emails"},
+    "Create a new calendar event tomorrow at 2 PM called 'Team sync'.": {"create calendar event"},
+    "What’s on my schedule for today?": {"list calendar events"},
+    "What’s on my schedule for next week?": {"list calendar events"},
+    "Add a meeting on Friday from 9AM to 10AM with summary 'Project planning' at location 'Conference Room A'.": {"create calendar event"},
+    "Remind me about my dentist appointment on August 25th at 11 AM. Put 'teeth cleaning' in the description.": {"create calendar event"},
+    "List my calendar events for tomorrow.": {"list calendar events"},
+    "Create a new task: buy groceries, notes: milk and eggs, due: Monday at 5 PM.": {"create task"},
+    "Make a task to 'Finish the budget report' with notes 'check line items', due next Friday.": {"create task"},
+    "Show me all my tasks.": {"list tasks"},
+    "Add a to-do titled 'Pay electricity bill' and remind me tomorrow morning.": {"create task"},
+}
+
+
+def load_prompts(path: str = PROMPTS_PATH) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip().strip('"') for line in f if line.strip().startswith('"')]
+
+
+def evaluate(engine, cases: List[Tuple[str, Set[str]]]) -> Dict:
+    engine.classify(cases[0][0])
+    latencies = []
+    misses = []
+    for text, expected in cases:
+        start = time.perf_counter()
+        result = engine.classify(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if result["labels"][0] not in expected:
+            misses.append({"text": text, "predicted": result["labels"][0], "expected": sorted(expected)})
+    ordered = sorted(latencies)
+    return {
+        "engine": engine.name,
+        "accuracy": round(1 - len(misses) / len(cases), 3),
+        "mean_ms": round(statistics.mean(latencies), 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1),
+        "misses": misses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare intent engines on the phrasings in prompts.txt")
+    parser.add_argument("--engines", default=",".join(nlp_engine.INTENT_ENGINES))
+    args = parser.parse_args()
+
+    cases = [(text, EXPECTED_INTENTS[text]) for text in load_prompts() if text in EXPECTED_INTENTS]
+    reports = []
+    for name in args.engines.split(","):
+        engine = nlp_engine.build_intent_engine(name)
+        reports.append(evaluate(engine, cases))
+        engine.close()
+    print(json.dumps(reports, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
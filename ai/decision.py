@@ -1,4 +1,7 @@
+import logging
 from typing import Dict, Any
+from ai.metrics import METRICS_ENABLED, TOOL_CALLS
+from ai.timings import span_labels, timed
 from tools.tool_registry import find_tool_for_intent
 from db.user_preferences import get_user_preference
 
@@ -6,12 +9,22 @@ def decide_next_action(parsed: Dict[str, Any]) -> Dict[str, Any]:
     intent = parsed.get("intent", "unknown")
     confidence = parsed.get("confidence", 0.0)
     user_text = parsed.get("original_text", "")
-    threshold = get_user_preference("louis", "min_confidence_threshold")
-    print(f"Intent: {intent}, confidence: {confidence}, threshold: {threshold}")
+    with timed("preferences"):
+        threshold = get_user_preference("louis", "min_confidence_threshold")
+    logging.info(f"Intent: {intent}, confidence: {confidence}, threshold: {threshold}")
     if confidence < threshold:
         # return {"tool": "none", "action": "not_sure", "message": f"Low confidence ({confidence:.2f}). Please rephrase."}
         intent = "unknown"
     tool = find_tool_for_intent(intent)
     if not tool:
         return {"tool": "none", "action": "no_tool_available", "message": f"No tool handles intent '{intent}'."}
-    return tool.parse_and_execute(user_text, intent=intent)
+    with span_labels(tool=tool.get_name(), intent=intent), timed("dispatch"):
+        try:
+            result = tool.parse_and_execute(user_text, intent=intent)
+        except Exception:
+            if METRICS_ENABLED:
+                TOOL_CALLS.inc(tool=tool.get_name(), intent=intent, outcome="error")
+            raise
+    if METRICS_ENABLED:
+        TOOL_CALLS.inc(tool=tool.get_name(), intent=intent, outcome="ok")
+    return result
@@ -0,0 +1,39 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+EventSink = Callable[[Dict[str, Any]], None]
+
+# Set per streaming request. The stage executors run work in a
+# copy of the caller's context, so tools emitting on worker threads reach it.
+_event_sink: contextvars.ContextVar[Optional[EventSink]] = contextvars.ContextVar("event_sink", default=None)
+
+def set_event_sink(sink: Optional[EventSink]) -> contextvars.Token:
+    return _event_sink.set(sink)
+
+def reset_event_sink(token: contextvars.Token) -> None:
+    _event_sink.reset(token)
+
+# Plan step being run, so events from inside a tool (summary tokens) say which
+# step they belong to when several steps stream at once.
+_step: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("event_step", default=None)
+
+@contextmanager
+def event_step(step: int) -> Iterator[None]:
+    token = _step.set(step)
+    try:
+        yield
+    finally:
+        _step.reset(token)
+
+def is_streaming() -> bool:
+    return _event_sink.get() is not None
+
+def emit(event: str, **data: Any) -> None:
+    sink = _event_sink.get()
+    if sink is not None:
+        step = _step.get()
+        if step is not None:
+            data.setdefault("step", step)
+        sink({"event": event, "ts": time.time(), **data})
@@ -0,0 +1,135 @@
+import json
+import re
+from typing import Any, Dict, Optional
+
+HIGH_SURROGATE = re.compile(r"d[89ab]", re.IGNORECASE)
+ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+class JsonStringFieldStreamer:
+    def __init__(self, field: str = "summary") -> None:
+        self._key = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buffer = ""
+        self._pos = 0
+        self._in_value = False
+        self.done = False
+        self.value = ""
+
+    def feed(self, chunk: str) -> str:
+        if self.done:
+            return ""
+        self._buffer += chunk
+        if not self._in_value:
+            match = self._key.search(self._buffer)
+            if not match:
+                return ""
+            self._in_value = True
+            self._pos = match.end()
+
+        decoded = []
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char == '"':
+                self.done = True
+                pos += 1
+                break
+            if char != "\\":
+                decoded.append(char)
+                pos += 1
+                continue
+            if pos + 1 >= len(buffer):
+                break
+            escape = buffer[pos + 1]
+            if escape == "u":
+                # A high surrogate is only decodable together with the low half that follows it
+                width = 12 if HIGH_SURROGATE.match(buffer, pos + 2) else 6
+                if pos + width > len(buffer):
+                    break
+                decoded.append(self._decode_unicode(buffer[pos:pos + width]))
+                pos += width
+            else:
+                decoded.append(ESCAPES.get(escape, escape))
+                pos += 2
+        self._pos = pos
+        text = "".join(decoded)
+        self.value += text
+        return text
+
+    @staticmethod
+    def _decode_unicode(escape: str) -> str:
+        try:
+            return json.loads(f'"{escape}"')
+        except json.JSONDecodeError:
+            return ""
+
+    @property
+    def raw(self) -> str:
+        return self._buffer
+
+# Only outside strings: the rest of the text must hold whole strings
+PYTHON_LITERALS = re.compile(r"\b(True|False|None)\b(?=(?:[^\"\\]|\\.|\"(?:[^\"\\]|\\.)*\")*$)")
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+class IncrementalJsonObjectParser:
+    def __init__(self) -> None:
+        self._chars: list = []
+        self._started = False
+        self._stack: list = []
+        self._in_string = False
+        self._escaped = False
+        self.done = False
+
+    def feed(self, chunk: str) -> bool:
+        for char in chunk:
+            if self.done:
+                break
+            if not self._started:
+                # Skip any chatter before the object
+                if char != "{":
+                    continue
+                self._started = True
+            self._chars.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._stack.append("}" if char == "{" else "]")
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    self.done = True
+        return self.done
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chars)
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        # An object that never closed was cut off mid-way; its values can't be trusted
+        if not self.done:
+            return None
+        text = self.text
+        for candidate in (text, self._repair(text)):
+            try:
+                value = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            return value if isinstance(value, dict) else None
+        return None
+
+    @staticmethod
+    def _repair(text: str) -> str:
+        text = TRAILING_COMMA.sub(r"\1", text)
+        return PYTHON_LITERALS.sub(lambda match: {"True": "true", "False": "false", "None": "null"}[match.group(1)], text)
+
+def parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    parser = IncrementalJsonObjectParser()
+    parser.feed(text)
+    return parser.result()
@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "ollama_http")
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "5"))
+OLLAMA_READ_TIMEOUT = float(os.environ.get("OLLAMA_READ_TIMEOUT", "120"))
+OLLAMA_MAX_CONCURRENCY = int(os.environ.get("OLLAMA_MAX_CONCURRENCY", "4"))
+OLLAMA_QUEUE_TIMEOUT = float(os.environ.get("OLLAMA_QUEUE_TIMEOUT", "60"))
+
+# "json" or a JSON schema dict, passed through as Ollama's `format`
+JsonFormat = Optional[Union[str, Dict[str, Any]]]
+
+
+class LLMError(RuntimeError):
+    pass
+
+
+def _deadline(timeout: Optional[float]) -> Optional[float]:
+    return None if timeout is None else time.monotonic() + timeout
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+class LLMBackend(ABC):
+    @abstractmethod
+    def generate(self, prompt: str, model_name: str = "dolphin3", options: Optional[Dict[str, Any]] = None, format: JsonFormat = None, timeout: Optional[float] = None) -> str:
+        pass
+
+    def stream(self, prompt: str, model_name: str = "dolphin3", options: Optional[Dict[str, Any]] = None, format: JsonFormat = None, timeout: Optional[float] = None) -> Iterator[str]:
+        yield self.generate(prompt, model_name=model_name, options=options, format=format, timeout=timeout)
+
+    def close(self) -> None:
+        pass
+
+
+class OllamaHTTPBackend(LLMBackend):
+    def __init__(
+        self,
+        base_url: str = OLLAMA_URL,
+        keep_alive: str = OLLAMA_KEEP_ALIVE,
+        connect_timeout: float = OLLAMA_CONNECT_TIMEOUT,
+        read_timeout: float = OLLAMA_READ_TIMEOUT,
+        max_concurrency: int = OLLAMA_MAX_CONCURRENCY,
+        queue_timeout: float = OLLAMA_QUEUE_TIMEOUT,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.keep_alive = keep_alive
+        self.timeout = (connect_timeout, read_timeout)
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def _payload(self, prompt: str, model_name: str, options: Optional[Dict[str, Any]], format: JsonFormat, stream: bool) -> Dict[str, Any]:
+        payload = {
+            "model": model_name,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+        }
+        if options:
+            payload["options"] = options
+        if format:
+            payload["format"] = format
+        return payload
+
+    def _acquire_slot(self, deadline: Optional[float]) -> None:
+        wait = min(self.queue_timeout, _remaining(deadline)) if deadline is not None else self.queue_timeout
+        if not self._slots.acquire(timeout=wait):
+            raise LLMError(f"No LLM slot free after {wait:.1f}s")
+
+    def _request_timeout(self, deadline: Optional[float]) -> Tuple[float, float]:
+        if deadline is None:
+            return self.timeout
+        remaining = max(_remaining(deadline), 0.001)
+        return min(self.timeout[0], remaining), min(self.timeout[1], remaining)
+
+    def generate(self, prompt: str, model_name: str = "dolphin3", options: Optional[Dict[str, Any]] = None, format: JsonFormat = None, timeout: Optional[float] = None) -> str:
+        payload = self._payload(prompt, model_name, options, format, stream=False)
+        deadline = _deadline(timeout)
+        self._acquire_slot(deadline)
+        try:
+            response = self._session.post(f"{self.base_url}/api/generate", json=payload, timeout=self._request_timeout(deadline))
+            response.raise_for_status()
+            return response.json().get("response", "")
+        except requests.RequestException as e:
+            raise LLMError(f"Ollama request failed: {e}") from e
+        finally:
+            self._slots.release()
+
+    def stream(self, prompt: str, model_name: str = "dolphin3", options: Optional[Dict[str, Any]] = None, format: JsonFormat = None, timeout: Optional[float] = None) -> Iterator[str]:
+        payload = self._payload(prompt, model_name, options, format, stream=True)
+        deadline = _deadline(timeout)
+        self._acquire_slot(deadline)
+        try:
+            with self._session.post(f"{self.base_url}/api/generate", json=payload, timeout=self._request_timeout(deadline), stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    # Closing the response stops Ollama generating and frees the slot
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise LLMError(f"Ollama stream ran past its {timeout}s budget")
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise LLMError(f"Ollama stream failed: {chunk['error']}")
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        return
+        except requests.RequestException as e:
+            raise LLMError(f"Ollama request failed: {e}") from e
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        self._session.close()
+
+
+class OllamaCLIBackend(LLMBackend):
+    def __init__(self) -> None:
+        self._warned_format = False
+
+    def generate(self, prompt: str, model_name: str = "dolphin3", options: Optional[Dict[str, Any]] = None, format: JsonFormat = None, timeout: Optional[float] = None) -> str:
+        if format and not self._warned_format:
+            # `ollama run` has no way to pass a format, so output is unconstrained
+            logging.warning("LLM_BACKEND=ollama_cli ignores the JSON format constraint; use ollama_http for constrained decoding")
+            self._warned_format = True
+        cmd = ["ollama", "run", model_name, prompt]
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                text=True, encoding="utf-8")
+        try:
+            out, err = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise LLMError(f"ollama run took longer than {timeout}s") from None
+        if err:
+            logging.error(f"LLM error: {err}")
+        return out
+
+
+BACKENDS = {
+    "ollama_http": OllamaHTTPBackend,
+    "ollama_cli": OllamaCLIBackend,
+}
+
+_client: Optional[LLMBackend] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMBackend:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                try:
+                    _client = BACKENDS[LLM_BACKEND]()
+                except KeyError:
+                    raise LLMError(f"Unknown LLM_BACKEND '{LLM_BACKEND}'") from None
+    return _client
+
+
+def set_llm_client(client: Optional[LLMBackend]) -> None:
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client:
+            _client.close()
+        _client = client
@@ -0,0 +1,35 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+_status: Dict[str, Dict[str, Any]] = {}
+_status_lock = threading.Lock()
+
+def register_model(name: str) -> None:
+    with _status_lock:
+        _status.setdefault(name, {"state": "not_loaded"})
+
+# Models loaded lazily on first use (gates_readiness=False) are reported but do
+# not hold /ready back: nothing loads them before the first request that needs them.
+@contextmanager
+def track_model_load(name: str, gates_readiness: bool = True):
+    with _status_lock:
+        _status[name] = {"state": "loading", "gates_readiness": gates_readiness}
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        with _status_lock:
+            _status[name] = {"state": "failed", "error": str(e), "gates_readiness": gates_readiness}
+        raise
+    with _status_lock:
+        _status[name] = {"state": "ready", "load_seconds": round(time.perf_counter() - start, 3), "gates_readiness": gates_readiness}
+
+def get_model_status() -> Dict[str, Dict[str, Any]]:
+    with _status_lock:
+        return {name: dict(status) for name, status in _status.items()}
+
+def all_models_ready() -> bool:
+    with _status_lock:
+        return all(status["state"] == "ready" for status in _status.values() if status.get("gates_readiness", True))
@@ -1,22 +1,182 @@
-from transformers import pipeline
+import logging
+import os
+import threading
+from typing import Any, Dict, List
 
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+from ai.model_status import register_model, track_model_load
+
+INTENT_ENGINE = os.environ.get("INTENT_ENGINE", "zero_shot")
+INTENT_BATCH_MAX_SIZE = int(os.environ.get("INTENT_BATCH_MAX_SIZE", "16"))
+INTENT_BATCH_MAX_WAIT_MS = float(os.environ.get("INTENT_BATCH_MAX_WAIT_MS", "10"))
+INTENT_EMBEDDING_MODEL = os.environ.get("INTENT_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+INTENT_EMBEDDING_TEMPERATURE = float(os.environ.get("INTENT_EMBEDDING_TEMPERATURE", "0.05"))
+
+CANDIDATE_LABELS = [
+    "check email",
+    "list emails",
+    "read emails",
+    "create calendar event",
+    "list calendar events",
+    "create task",
+    "list tasks",
+    "web search",
+    "update transactions",
+    "unknown",
+]
+
+# Extra label-side phrasings for the embedding engine. Each label is scored by
+# its best matching phrasing, so these only need to cover how people ask.
+LABEL_DESCRIPTIONS = {
+    "check email": ["check my gmail inbox", "do I have any new email messages"],
+    "list emails": ["list the emails in my inbox", "show me my recent emails from a label"],
+    "read emails": ["read my emails out to me", "read the content of an email"],
+    "create calendar event": ["create a calendar event", "add a meeting to my calendar at a time"],
+    "list calendar events": ["what is on my schedule", "list my calendar events"],
+    "create task": ["create a new task", "add a to-do and remind me"],
+    "list tasks": ["show me my tasks", "list my to-do list"],
+    "web search": ["search the web", "look something up on the internet"],
+    "update transactions": ["update my bank transactions", "categorise my revolut spending"],
+    "unknown": ["something unrelated to email, calendar, tasks or search"],
+}
+
+
+class ZeroShotIntentEngine:
+    name = "zero_shot"
+    multi_label_threshold = 0.5
+
+    def __init__(self, labels: List[str] = CANDIDATE_LABELS) -> None:
+        from transformers import pipeline
+        from ai.batch_classifier import BatchingZeroShotClassifier
+
+        self.labels = labels
+        self.pipeline = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+        self.batcher = BatchingZeroShotClassifier(
+            self.pipeline,
+            max_batch_size=INTENT_BATCH_MAX_SIZE,
+            max_wait_ms=INTENT_BATCH_MAX_WAIT_MS,
+        )
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        return self.batcher.classify(text, self.labels)
+
+    def classify_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        return self.batcher.classify_many(texts, self.labels)
+
+    def close(self) -> None:
+        self.batcher.close()
+
+
+class EmbeddingIntentEngine:
+    name = "embedding"
+    multi_label_threshold = 0.45
+
+    def __init__(
+        self,
+        labels: List[str] = CANDIDATE_LABELS,
+        model_name: str = INTENT_EMBEDDING_MODEL,
+        temperature: float = INTENT_EMBEDDING_TEMPERATURE,
+    ) -> None:
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        self.labels = labels
+        self.temperature = temperature
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name)
+        self.model.eval()
+
+        phrases: List[str] = []
+        owners: List[int] = []
+        for idx, label in enumerate(labels):
+            for phrase in [f"This example is {label}."] + LABEL_DESCRIPTIONS.get(label, []):
+                phrases.append(phrase)
+                owners.append(idx)
+        self.label_embeddings = self._encode(phrases)
+        self.phrase_owner = torch.tensor(owners)
+
+    def _encode(self, texts: List[str]):
+        import torch
+
+        inputs = self.tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
+        with torch.inference_mode():
+            hidden = self.model(**inputs).last_hidden_state
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        return torch.nn.functional.normalize(pooled, dim=-1)
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        return self.classify_many([text])[0]
+
+    def classify_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        import torch
+
+        similarities = self._encode(texts) @ self.label_embeddings.T
+        per_label = torch.full((len(texts), len(self.labels)), -1.0)
+        owners = self.phrase_owner.unsqueeze(0).expand(len(texts), -1)
+        per_label = per_label.scatter_reduce(1, owners, similarities, reduce="amax")
+        results = []
+        for text, label_similarities in zip(texts, per_label):
+            scores = (label_similarities / self.temperature).softmax(dim=0).tolist()
+            ranked = sorted(zip(self.labels, scores), key=lambda pair: pair[1], reverse=True)
+            results.append({
+                "sequence": text,
+                "labels": [label for label, _ in ranked],
+                "scores": [score for _, score in ranked],
+                # Cosine similarity is already an independent per-label score
+                "multi_label_scores": dict(zip(self.labels, label_similarities.clamp(min=0.0).tolist())),
+            })
+        return results
+
+    def close(self) -> None:
+        pass
+
+
+INTENT_ENGINES = {
+    ZeroShotIntentEngine.name: ZeroShotIntentEngine,
+    EmbeddingIntentEngine.name: EmbeddingIntentEngine,
+}
+
+
+def build_intent_engine(name: str = INTENT_ENGINE):
+    try:
+        engine_class = INTENT_ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown INTENT_ENGINE '{name}'. Options: {', '.join(INTENT_ENGINES)}") from None
+    with track_model_load(f"intent_engine:{name}"):
+        return engine_class()
+
+
+_intent_engine = None
+_intent_engine_lock = threading.Lock()
+register_model(f"intent_engine:{INTENT_ENGINE}")
+
+
+def get_intent_engine():
+    global _intent_engine
+    if _intent_engine is None:
+        with _intent_engine_lock:
+            if _intent_engine is None:
+                _intent_engine = build_intent_engine()
+    return _intent_engine
+
+
+def warm_up_models() -> None:
+    try:
+        get_intent_engine()
+    except Exception as e:
+        logging.error(f"Intent engine warm-up failed: {e}")
+
+
+def close_intent_engine() -> None:
+    global _intent_engine
+    with _intent_engine_lock:
+        if _intent_engine is not None:
+            _intent_engine.close()
+            _intent_engine = None
 
 
 def process_user_input(user_input: str) -> dict:
-    candidate_labels = [
-        "check email",
-        "list emails",
-        "read emails",
-        "create calendar event",
-        "list calendar events",
-        "create task",
-        "list tasks",
-        "web search",
-        "update transactions",
-        "unknown",
-    ]
-    result = classifier(user_input, candidate_labels)
+    result = get_intent_engine().classify(user_input)
     return {
         "intent": result["labels"][0],
         "confidence": result["scores"][0],
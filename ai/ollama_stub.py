@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+Responder = Callable[[Dict], str]
+
+
+def _default_responder(payload: Dict) -> str:
+    return json.dumps({"summary": "stub"})
+
+
+class OllamaStubServer:
+    """In-process stand-in for the Ollama HTTP API (POST /api/generate)."""
+
+    def __init__(
+        self,
+        responder: Optional[Responder] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        stream_chunk_size: int = 8,
+        latency: float = 0.0,
+        chunk_latency: float = 0.0,
+    ) -> None:
+        self.responder = responder or _default_responder
+        self.stream_chunk_size = stream_chunk_size
+        # Seconds before the first byte, and between streamed chunks
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.requests: List[Dict] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests.append(payload)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if payload.get("stream"):
+                    self._stream(payload)
+                    return
+                body = json.dumps({
+                    "model": payload.get("model"),
+                    "response": stub.responder(payload),
+                    "done": True,
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, payload):
+                text = stub.responder(payload)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    for start in range(0, len(text), stub.stream_chunk_size):
+                        if start and stub.chunk_latency:
+                            time.sleep(stub.chunk_latency)
+                        chunk = {"model": payload.get("model"), "response": text[start:start + stub.stream_chunk_size], "done": False}
+                        self.wfile.write(json.dumps(chunk).encode("utf-8") + b"\n")
+                        self.wfile.flush()
+                    self.wfile.write(json.dumps({"model": payload.get("model"), "response": "", "done": True}).encode("utf-8") + b"\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client stopped reading, as Ollama clients do once they have enough
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OllamaStubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OllamaStubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from ai.decision import decide_next_action
+from ai.events import emit, event_step
+from ai.nlp_engine import get_intent_engine
+from tools.tool_registry import get_registry
+
+PLANNER_ENABLED = os.environ.get("PLANNER_ENABLED", "1") == "1"
+PLANNER_INTENT_THRESHOLD = os.environ.get("PLANNER_INTENT_THRESHOLD")
+PLANNER_MAX_STEPS = int(os.environ.get("PLANNER_MAX_STEPS", "4"))
+
+WRITE_INTENT_PREFIXES = ("create", "update")
+
+# Runs fn(*args) off the event loop, e.g. the bounded tool stage's run; it may
+# refuse a call (raise) without running it.
+StepRunner = Callable[..., Awaitable[Any]]
+
+# Only explicit conjunctions and sequence markers start a new clause; a full
+# stop on its own usually just continues the same request.
+CLAUSE_SPLIT = re.compile(
+    r"[,.;!?]\s*(?:and\s+)?(?:also|then|plus|after that)\b"
+    r"|\s+(?:and also|and then|plus|after that|as well as)\b",
+    re.IGNORECASE,
+)
+LEADING_CONNECTIVE = re.compile(r"^(?:and|then|also|plus|so|could you|can you|please)\b[\s,]*", re.IGNORECASE)
+ANAPHORA = re.compile(r"\b(?:it|them|the same|the next day|the day after)\b", re.IGNORECASE)
+MIN_CLAUSE_WORDS = 3
+
+class PlanStep(BaseModel):
+    id: int
+    intent: str
+    confidence: float
+    text: str
+    depends_on: List[int] = Field(default_factory=list)
+
+class Plan(BaseModel):
+    original_text: str
+    intent: str
+    confidence: float
+    steps: List[PlanStep]
+    skipped: List[PlanStep] = Field(default_factory=list)
+
+    @property
+    def parsed(self) -> Dict[str, Any]:
+        return {"intent": self.intent, "confidence": self.confidence, "original_text": self.original_text}
+
+def segment_clauses(text: str) -> List[str]:
+    clauses: List[str] = []
+    for fragment in CLAUSE_SPLIT.split(text):
+        fragment = fragment.strip(" ,")
+        while True:
+            stripped = LEADING_CONNECTIVE.sub("", fragment)
+            if stripped == fragment:
+                break
+            fragment = stripped
+        if not fragment:
+            continue
+        if clauses and len(fragment.split()) < MIN_CLAUSE_WORDS:
+            clauses[-1] = f"{clauses[-1]} {fragment}"
+        else:
+            clauses.append(fragment)
+    return clauses
+
+def _intent_threshold(engine) -> float:
+    if PLANNER_INTENT_THRESHOLD:
+        return float(PLANNER_INTENT_THRESHOLD)
+    return getattr(engine, "multi_label_threshold", 0.5)
+
+def _tool_for_intent(intent: str) -> Optional[str]:
+    return get_registry().intent_owners().get(intent)
+
+def _is_write(intent: str) -> bool:
+    return intent.startswith(WRITE_INTENT_PREFIXES)
+
+def _clause_intent(result: Dict[str, Any], candidates: set, threshold: float) -> Optional[str]:
+    # A clause only gets a step of its own if it clears the threshold by itself;
+    # otherwise it is detail for the step before it.
+    scores = result.get("multi_label_scores") or {result["labels"][0]: threshold}
+    return next(
+        (label for label in result["labels"] if label in candidates and scores.get(label, 0.0) >= threshold),
+        None,
+    )
+
+def plan_user_input(user_input: str) -> Plan:
+    engine = get_intent_engine()
+    overall = engine.classify(user_input)
+    intent, confidence = overall["labels"][0], overall["scores"][0]
+    single = Plan(
+        original_text=user_input,
+        intent=intent,
+        confidence=confidence,
+        steps=[PlanStep(id=0, intent=intent, confidence=confidence, text=user_input)],
+    )
+    if not PLANNER_ENABLED:
+        return single
+
+    threshold = _intent_threshold(engine)
+    candidates = {
+        label for label, score in overall.get("multi_label_scores", {}).items()
+        if score >= threshold and label != "unknown"
+    }
+    if len(candidates) < 2:
+        return single
+    clauses = segment_clauses(user_input)
+    if len(clauses) < 2:
+        return single
+
+    steps: List[PlanStep] = []
+    for clause, result in zip(clauses, engine.classify_many(clauses)):
+        clause_intent = _clause_intent(result, candidates, threshold)
+        if clause_intent is None:
+            if steps:
+                steps[-1].text = f"{steps[-1].text} {clause}"
+            continue
+        if steps and steps[-1].intent == clause_intent:
+            steps[-1].text = f"{steps[-1].text} {clause}"
+            continue
+        clause_confidence = result["scores"][result["labels"].index(clause_intent)]
+        if steps and ANAPHORA.search(clause):
+            # "put it on my calendar": the step needs the previous clause to know what "it" is
+            clause = f"{steps[-1].text}. {clause}"
+        steps.append(PlanStep(id=len(steps), intent=clause_intent, confidence=clause_confidence, text=clause))
+
+    if len(steps) < 2:
+        return single
+    steps, skipped = steps[:PLANNER_MAX_STEPS], steps[PLANNER_MAX_STEPS:]
+    if skipped:
+        logging.warning(f"Plan exceeds PLANNER_MAX_STEPS={PLANNER_MAX_STEPS}, skipping: {[step.intent for step in skipped]}")
+    for step in steps:
+        tool = _tool_for_intent(step.intent)
+        # A step reading from a tool waits for earlier writes to the same tool
+        step.depends_on = [
+            earlier.id for earlier in steps[:step.id]
+            if _is_write(earlier.intent) and _tool_for_intent(earlier.intent) == tool
+        ]
+    logging.info(f"Planned {len(steps)} steps: {[step.intent for step in steps]}")
+    return Plan(original_text=user_input, intent=intent, confidence=confidence, steps=steps, skipped=skipped)
+
+def _decide(step: PlanStep) -> Dict[str, Any]:
+    emit("tool_started", step=step.id, intent=step.intent)
+    with event_step(step.id):
+        result = decide_next_action({"intent": step.intent, "confidence": step.confidence, "original_text": step.text})
+    emit("tool_result", step=step.id, intent=step.intent, result=result)
+    return result
+
+def _run_step(step: PlanStep) -> Dict[str, Any]:
+    try:
+        return _decide(step)
+    except Exception as e:
+        logging.error(f"Plan step '{step.intent}' failed: {e}")
+        result = {"tool": "none", "action": "step_failed", "message": f"Could not complete '{step.intent}': {e}"}
+        emit("tool_result", step=step.id, intent=step.intent, result=result)
+        return result
+
+def _not_started(step: PlanStep, error: Exception) -> Dict[str, Any]:
+    logging.warning(f"Plan step '{step.intent}' was not started: {error}")
+    result = {
+        "tool": "none",
+        "action": "step_not_started",
+        "message": f"Could not start '{step.intent}': {error}",
+        "retry_after": getattr(error, "retry_after", None),
+    }
+    emit("tool_result", step=step.id, intent=step.intent, result=result)
+    return result
+
+async def execute_plan(plan: Plan, run: StepRunner) -> Dict[str, Any]:
+    if len(plan.steps) == 1 and not plan.skipped:
+        return await run(_decide, plan.steps[0])
+
+    results: Dict[int, Dict[str, Any]] = {}
+    not_started = 0
+    pending = list(plan.steps)
+    while pending:
+        ready = [step for step in pending if all(dep in results for dep in step.depends_on)]
+        # _run_step reports its own failures, so an exception here means the
+        # runner refused the step (e.g. the stage is at capacity) and it never ran.
+        wave = await asyncio.gather(*(run(_run_step, step) for step in ready), return_exceptions=True)
+        refused = [outcome for outcome in wave if isinstance(outcome, Exception)]
+        if refused and len(refused) == len(wave) and not results:
+            # Nothing has run yet, so the whole request can safely be retried
+            raise refused[0]
+        for step, outcome in zip(ready, wave):
+            if isinstance(outcome, Exception):
+                # Other steps may already have written: report this one rather than
+                # failing the request and inviting a retry that repeats those writes
+                outcome = _not_started(step, outcome)
+                not_started += 1
+            results[step.id] = outcome
+        pending = [step for step in pending if step.id not in results]
+
+    steps = [
+        {"intent": step.intent, "text": step.text, "result": results[step.id]}
+        for step in plan.steps
+    ]
+    summary = " ".join(
+        str(step["result"].get("summary") or step["result"].get("message", "")).strip() for step in steps
+    ).strip()
+    message = f"Completed {len(steps) - not_started} of {len(steps)} actions." if not_started else f"Completed {len(steps)} actions."
+    if plan.skipped:
+        message += f" Skipped {len(plan.skipped)} more (limit is {PLANNER_MAX_STEPS}): " + ", ".join(
+            f"'{step.text}'" for step in plan.skipped
+        ) + "."
+    return {
+        "tool": "planner",
+        "action": "multi_intent",
+        "steps": steps,
+        "skipped": [{"intent": step.intent, "text": step.text} for step in plan.skipped],
+        "summary": summary,
+        "message": message,
+    }
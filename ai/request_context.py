@@ -0,0 +1,34 @@
+import contextvars
+import logging
+import os
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+# Copied onto worker threads with the rest of the context, so tool logs carry it too
+_request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+def set_request_id(request_id: str) -> contextvars.Token:
+    return _request_id.set(request_id)
+
+def reset_request_id(token: contextvars.Token) -> None:
+    _request_id.reset(token)
+
+def get_request_id() -> str:
+    return _request_id.get()
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return True
+
+def configure_logging(level: str = LOG_LEVEL) -> None:
+    root = logging.getLogger()
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(level)
+    for handler in root.handlers:
+        if not any(isinstance(existing, RequestIdFilter) for existing in handler.filters):
+            handler.addFilter(RequestIdFilter())
@@ -0,0 +1,69 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from ai.metrics import METRICS_ENABLED, STAGE_SECONDS
+
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "0") == "1"
+
+class StageTimings:
+    def __init__(self) -> None:
+        self._durations: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        # Planner steps run concurrently, so a stage accumulates time across threads
+        with self._lock:
+            self._durations[stage] = self._durations.get(stage, 0.0) + seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._durations)
+
+    def header(self) -> str:
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.snapshot().items())
+
+# Set per request like the event sink; worker threads see it through the copied context.
+_timings: contextvars.ContextVar[Optional[StageTimings]] = contextvars.ContextVar("stage_timings", default=None)
+
+def start_timings() -> contextvars.Token:
+    return _timings.set(StageTimings())
+
+def reset_timings(token: contextvars.Token) -> None:
+    _timings.reset(token)
+
+def current_timings() -> Optional[StageTimings]:
+    return _timings.get()
+
+# Tool and intent of the step being dispatched, attached to stage metrics
+_span_labels: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("span_labels", default={})
+
+@contextmanager
+def span_labels(**labels: str) -> Iterator[None]:
+    token = _span_labels.set({**_span_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _span_labels.reset(token)
+
+def record_timing(stage: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+    if METRICS_ENABLED:
+        labels = _span_labels.get()
+        STAGE_SECONDS.observe(seconds, stage=stage, tool=labels.get("tool", ""), intent=labels.get("intent", ""))
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    if not METRICS_ENABLED and _timings.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(stage, time.perf_counter() - start)
@@ -0,0 +1,244 @@
+import base64
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from pydantic import BaseModel
+
+class FakeGoogleConfig(BaseModel):
+    latency_ms: float = 40.0
+    jitter_ms: float = 10.0
+    messages: int = 50
+    calendars: int = 2
+    events: int = 20
+    tasklists: int = 2
+    tasks: int = 20
+    search_results: int = 5
+    snippet_chars: int = 200
+    body_chars: int = 2000
+    seed: int = 7
+
+def _iso(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def _parse_time(value: Optional[str], default: datetime) -> datetime:
+    if not value:
+        return default
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+# Serves the Gmail, Calendar, Tasks, Sheets and Custom Search calls the tools make
+class FakeGoogleServer:
+    def __init__(self, config: Optional[FakeGoogleConfig] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or FakeGoogleConfig()
+        self.request_count = 0
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.created_count = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def _handle(self, method):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length) if length else b""
+                server._delay()
+                if method == "POST" and urlsplit(self.path).path.startswith("/batch"):
+                    content_type, payload = server.handle_batch(self.headers.get("Content-Type", ""), body)
+                    self._reply(200, payload, content_type)
+                    return
+                status, result = server.route(method, self.path, body)
+                self._reply(status, json.dumps(result).encode("utf-8"), "application/json")
+
+            def _reply(self, status, payload, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _delay(self) -> None:
+        with self._lock:
+            self.request_count += 1
+            jitter = self._rng.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        time.sleep(max(0.0, self.config.latency_ms + jitter) / 1000)
+
+    def _text(self, prefix: str, chars: int) -> str:
+        text = f"{prefix} " + "lorem ipsum dolor sit amet " * (chars // 27 + 1)
+        return text[:chars]
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        parts = urlsplit(path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        route = unquote(parts.path)
+        data = json.loads(body) if body else {}
+
+        if route == "/customsearch/v1":
+            return 200, self.search(query.get("q", ""), int(query.get("num", self.config.search_results)))
+        if route == "/gmail/v1/users/me/messages":
+            return 200, self.list_messages(int(query.get("maxResults", 100)))
+        match = re.fullmatch(r"/gmail/v1/users/me/messages/([^/]+)", route)
+        if match:
+            return 200, self.message(match.group(1), query.get("format", "full"))
+        if route == "/calendar/v3/users/me/calendarList":
+            return 200, {"items": self.calendar_list()}
+        match = re.fullmatch(r"/calendar/v3/calendars/([^/]+)/events", route)
+        if match:
+            if method == "POST":
+                return 200, self.create(data, calendar_id=match.group(1))
+            return 200, {"items": self.list_events(match.group(1), query)}
+        if route == "/tasks/v1/users/@me/lists":
+            return 200, {"items": [{"id": f"list{i}", "title": f"List {i}"} for i in range(self.config.tasklists)]}
+        match = re.fullmatch(r"/tasks/v1/lists/([^/]+)/tasks", route)
+        if match:
+            if method == "POST":
+                return 200, self.create(data, tasklist=match.group(1))
+            return 200, {"items": self.list_tasks(match.group(1), int(query.get("maxResults", 100)))}
+        match = re.fullmatch(r"/v4/spreadsheets/([^/]+)/values/([^/:]+)(:append)?", route)
+        if match:
+            if match.group(3):
+                rows = data.get("values", [])
+                return 200, {"spreadsheetId": match.group(1), "updates": {"updatedRows": len(rows)}}
+            return 200, {"range": match.group(2), "values": []}
+        return 404, {"error": {"code": 404, "message": f"No fake for {method} {route}"}}
+
+    def handle_batch(self, content_type: str, body: bytes) -> Tuple[str, bytes]:
+        message = BytesParser().parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body)
+        boundary = "fake_batch_boundary"
+        out: List[str] = []
+        for part in message.get_payload():
+            inner = part.get_payload()
+            request_line, _, rest = inner.partition("\n")
+            method, path, _ = request_line.strip().split(" ", 2)
+            inner_body = rest.split("\n\n", 1)[1].encode("utf-8") if "\n\n" in rest else b""
+            status, result = self.route(method, path, inner_body.strip())
+            content_id = part["Content-ID"].strip("<>")
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Not Found'}\r\n"
+                f"Content-Type: application/json\r\n\r\n{json.dumps(result)}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        return f"multipart/mixed; boundary={boundary}", "".join(out).encode("utf-8")
+
+    def search(self, query: str, num: int) -> Dict[str, Any]:
+        return {
+            "items": [
+                {
+                    "title": f"Result {i} for {query}",
+                    "link": f"https://example.com/{i}",
+                    "snippet": self._text(f"Result {i}.", self.config.snippet_chars),
+                }
+                for i in range(min(num, self.config.search_results))
+            ]
+        }
+
+    def list_messages(self, max_results: int) -> Dict[str, Any]:
+        count = min(max_results, self.config.messages)
+        return {
+            "messages": [{"id": f"m{i}", "threadId": f"t{i}"} for i in range(count)],
+            "resultSizeEstimate": count,
+        }
+
+    def message(self, message_id: str, message_format: str) -> Dict[str, Any]:
+        headers = [
+            {"name": "Subject", "value": f"Subject of {message_id}"},
+            {"name": "From", "value": f"Sender {message_id} <{message_id}@example.com>"},
+            {"name": "Date", "value": "Mon, 1 Jan 2024 09:00:00 +0000"},
+        ]
+        payload: Dict[str, Any] = {"mimeType": "text/plain", "headers": headers}
+        if message_format == "full":
+            body = self._text(f"Body of {message_id}.", self.config.body_chars)
+            payload["body"] = {"data": base64.urlsafe_b64encode(body.encode("utf-8")).decode("ascii")}
+        return {
+            "id": message_id,
+            "threadId": message_id.replace("m", "t", 1),
+            "labelIds": ["INBOX", "UNREAD"],
+            "snippet": self._text(f"Snippet of {message_id}.", self.config.snippet_chars),
+            "internalDate": "1704099600000",
+            "payload": payload,
+        }
+
+    def calendar_list(self) -> List[Dict[str, Any]]:
+        calendars = [{"id": "primary", "summary": "Primary", "primary": True, "selected": True}]
+        calendars += [
+            {"id": f"calendar{i}", "summary": f"Calendar {i}", "selected": True}
+            for i in range(1, self.config.calendars)
+        ]
+        return calendars
+
+    def list_events(self, calendar_id: str, query: Dict[str, str]) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        start = _parse_time(query.get("timeMin"), now)
+        end = _parse_time(query.get("timeMax"), start + timedelta(days=7))
+        count = min(int(query.get("maxResults", 250)), self.config.events)
+        step = (end - start) / max(1, count)
+        events = []
+        for i in range(count):
+            event_start = start + step * i
+            events.append({
+                "id": f"{calendar_id}-e{i}",
+                "summary": f"Event {i} on {calendar_id}",
+                "location": f"Room {i}",
+                "description": self._text(f"Event {i}.", self.config.snippet_chars),
+                "start": {"dateTime": _iso(event_start), "timeZone": "Europe/Dublin"},
+                "end": {"dateTime": _iso(event_start + timedelta(minutes=30)), "timeZone": "Europe/Dublin"},
+            })
+        return events
+
+    def list_tasks(self, tasklist_id: str, max_results: int) -> List[Dict[str, Any]]:
+        now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        return [
+            {
+                "id": f"{tasklist_id}-t{i}",
+                "title": f"Task {i} in {tasklist_id}",
+                "notes": self._text(f"Task {i}.", self.config.snippet_chars),
+                "status": "needsAction",
+                "due": _iso(now + timedelta(days=i)),
+            }
+            for i in range(min(max_results, self.config.tasks))
+        ]
+
+    def create(self, data: Dict[str, Any], **location: str) -> Dict[str, Any]:
+        with self._lock:
+            self.created_count += 1
+            return {"id": f"created{self.created_count}", **location, **data}
+
+    def start(self) -> "FakeGoogleServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeGoogleServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
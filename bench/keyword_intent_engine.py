@@ -0,0 +1,57 @@
+import os
+import re
+import time
+from typing import Any, Dict, List
+
+from ai.nlp_engine import CANDIDATE_LABELS
+
+BENCH_CLASSIFY_MS = float(os.environ.get("BENCH_CLASSIFY_MS", "0"))
+
+# In priority order; the first match is the top label
+KEYWORD_RULES = [
+    ("read emails", re.compile(r"\bread\b.*\b(?:e-?mails?|messages?)\b", re.IGNORECASE)),
+    ("list emails", re.compile(r"\b(?:show|list|display)\b.*\be-?mails?\b", re.IGNORECASE)),
+    ("check email", re.compile(r"\b(?:gmail|inbox|e-?mails?|messages?)\b", re.IGNORECASE)),
+    ("list tasks", re.compile(r"\b(?:show|list)\b.*\btasks\b", re.IGNORECASE)),
+    ("create task", re.compile(r"\b(?:task|to-do|todo)\b", re.IGNORECASE)),
+    ("list calendar events", re.compile(r"\bschedule\b|\bcalendar events\b", re.IGNORECASE)),
+    ("create calendar event", re.compile(r"\b(?:event|meeting|appointment|calendar)\b", re.IGNORECASE)),
+    ("update transactions", re.compile(r"\b(?:transactions?|revolut|spending)\b", re.IGNORECASE)),
+    ("web search", re.compile(r"\b(?:search|look up|google)\b", re.IGNORECASE)),
+]
+
+# Stands in for the NLI model so benchmarks run without model weights; the
+# optional delay models the classification cost.
+class KeywordIntentEngine:
+    name = "keyword"
+    multi_label_threshold = 0.5
+
+    def __init__(self, labels: List[str] = CANDIDATE_LABELS, delay_ms: float = BENCH_CLASSIFY_MS) -> None:
+        self.labels = labels
+        self.delay = delay_ms / 1000
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        return self.classify_many([text])[0]
+
+    def classify_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        if self.delay:
+            time.sleep(self.delay)
+        return [self._classify(text) for text in texts]
+
+    def _classify(self, text: str) -> Dict[str, Any]:
+        matched = [label for label, pattern in KEYWORD_RULES if label in self.labels and pattern.search(text)]
+        matched = matched or ["unknown"]
+        rest = [label for label in self.labels if label not in matched]
+        top_score = 0.9 / len(matched) if len(matched) > 1 else 0.9
+        scores = [top_score] * len(matched) + [0.1 / max(1, len(rest))] * len(rest)
+        # Keep the first match ahead of ties
+        scores[0] += 1e-6
+        return {
+            "sequence": text,
+            "labels": matched + rest,
+            "scores": scores,
+            "multi_label_scores": {label: 0.9 if label in matched else 0.05 for label in self.labels},
+        }
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,98 @@
+import math
+import statistics
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+LATENCY_METRICS = ["p50_ms", "p95_ms", "p99_ms"]
+
+class Sample(BaseModel):
+    prompt: str
+    intent: str
+    status: int
+    latency_ms: float
+    stages: Dict[str, float] = Field(default_factory=dict)
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+def latency_stats(values: List[float], duration: Optional[float] = None) -> Dict[str, Any]:
+    ordered = sorted(values)
+    stats = {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered), 2) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 2),
+        "p95_ms": round(percentile(ordered, 0.95), 2),
+        "p99_ms": round(percentile(ordered, 0.99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+    if duration:
+        stats["throughput_rps"] = round(len(ordered) / duration, 2)
+    return stats
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    stages: Dict[str, float] = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                stages[name] = float(value)
+    return stages
+
+def build_report(samples: List[Sample], duration: float, config: Dict[str, Any]) -> Dict[str, Any]:
+    ok = [sample for sample in samples if sample.status == 200]
+    per_intent: Dict[str, List[float]] = {}
+    per_stage: Dict[str, List[float]] = {}
+    status_codes: Dict[str, int] = {}
+    for sample in samples:
+        status_codes[str(sample.status)] = status_codes.get(str(sample.status), 0) + 1
+    for sample in ok:
+        per_intent.setdefault(sample.intent, []).append(sample.latency_ms)
+        for stage, value in sample.stages.items():
+            per_stage.setdefault(stage, []).append(value)
+    return {
+        "config": config,
+        "duration_s": round(duration, 3),
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "status_codes": status_codes,
+        "overall": latency_stats([sample.latency_ms for sample in ok], duration),
+        "per_intent": {intent: latency_stats(values, duration) for intent, values in sorted(per_intent.items())},
+        "per_stage": {stage: latency_stats(values) for stage, values in sorted(per_stage.items())},
+    }
+
+def compare_reports(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    max_regression: float,
+    min_delta_ms: float,
+) -> List[Dict[str, Any]]:
+    regressions = []
+
+    def check(scope: str, now: Dict[str, Any], before: Dict[str, Any]) -> None:
+        for metric in LATENCY_METRICS:
+            if metric not in now or metric not in before:
+                continue
+            # Small absolute changes on fast paths are noise, not regressions
+            if now[metric] > before[metric] * (1 + max_regression) and now[metric] - before[metric] > min_delta_ms:
+                regressions.append({"scope": scope, "metric": metric, "baseline": before[metric], "current": now[metric]})
+        if "throughput_rps" in now and "throughput_rps" in before:
+            if now["throughput_rps"] < before["throughput_rps"] * (1 - max_regression):
+                regressions.append({
+                    "scope": scope,
+                    "metric": "throughput_rps",
+                    "baseline": before["throughput_rps"],
+                    "current": now["throughput_rps"],
+                })
+
+    check("overall", current["overall"], baseline["overall"])
+    for group in ("per_intent", "per_stage"):
+        for name, stats in current.get(group, {}).items():
+            if name in baseline.get(group, {}):
+                check(f"{group}:{name}", stats, baseline[group][name])
+    if current["errors"] > baseline.get("errors", 0):
+        regressions.append({"scope": "overall", "metric": "errors", "baseline": baseline.get("errors", 0), "current": current["errors"]})
+    return regressions
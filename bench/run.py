@@ -0,0 +1,210 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import requests
+
+from ai.ollama_stub import OllamaStubServer
+from bench.fake_google import FakeGoogleConfig, FakeGoogleServer
+from bench.report import Sample, build_report, compare_reports, parse_server_timing
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+TIME_FIELDS = ("time", "due", "after", "before", "date")
+
+def _schema_type(schema: Dict[str, Any]) -> str:
+    for option in schema.get("anyOf", [schema]):
+        if option.get("type") not in (None, "null"):
+            return option["type"]
+    return "string"
+
+def _fake_value(name: str, schema: Dict[str, Any]) -> Any:
+    field_type = _schema_type(schema)
+    if field_type == "integer":
+        return 5
+    if field_type == "boolean":
+        return False
+    if field_type == "array":
+        return []
+    if any(part in name for part in TIME_FIELDS):
+        tomorrow = datetime.now(timezone.utc).replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        return tomorrow.isoformat().replace("+00:00", "Z")
+    return f"bench {name}"
+
+def make_llm_responder(summary_chars: int):
+    summary = ("The results cover several items of interest. " * (summary_chars // 46 + 1))[:summary_chars]
+
+    def respond(payload: Dict[str, Any]) -> str:
+        schema = payload.get("format")
+        if not isinstance(schema, dict):
+            return "{}"
+        properties = schema.get("properties", {})
+        if "summary" in properties:
+            return json.dumps({"summary": summary})
+        # Required fields only: the tools fill in their own defaults for the rest
+        return json.dumps({name: _fake_value(name, properties[name]) for name in schema.get("required", [])})
+
+    return respond
+
+def configure_environment(google_url: str, ollama_url: str, args: argparse.Namespace) -> None:
+    # Read at import time by the agent modules, so set before importing them.
+    # Anything already set in the environment wins.
+    os.environ.setdefault("GOOGLE_API_ENDPOINT", google_url)
+    os.environ.setdefault("GOOGLE_SEARCH_URL", f"{google_url}/customsearch/v1")
+    os.environ.setdefault("OLLAMA_URL", ollama_url)
+    os.environ.setdefault("MONGO_MOCK", "1")
+    os.environ.setdefault("SERVER_TIMING_ENABLED", "1")
+    os.environ.setdefault("INTENT_ENGINE", args.intent_engine)
+    os.environ.setdefault("BENCH_CLASSIFY_MS", str(args.classify_ms))
+
+def start_app() -> Any:
+    import uvicorn
+
+    from ai import nlp_engine
+    from agent.main import app
+    from bench.keyword_intent_engine import KeywordIntentEngine
+    from db.user_preferences import get_user_preference, set_user_preference
+
+    nlp_engine.INTENT_ENGINES.setdefault(KeywordIntentEngine.name, KeywordIntentEngine)
+    # decide_next_action compares against this threshold; an empty database has none
+    if get_user_preference("louis", "min_confidence_threshold") is None:
+        set_user_preference("louis", "min_confidence_threshold", 0.0)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Agent server failed to start")
+        time.sleep(0.05)
+    host, port = sock.getsockname()[:2]
+    return server, thread, f"http://{host}:{port}"
+
+def run_load(url: str, prompts: List[str], total: int, concurrency: int, timeout: float) -> List[Sample]:
+    local = threading.local()
+
+    def send(index: int) -> Sample:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        prompt = prompts[index % len(prompts)]
+        start = time.perf_counter()
+        try:
+            response = session.post(url, json=prompt, timeout=timeout)
+        except requests.RequestException as e:
+            logging.warning(f"Request failed: {e}")
+            return Sample(prompt=prompt, intent="error", status=0, latency_ms=(time.perf_counter() - start) * 1000)
+        latency_ms = (time.perf_counter() - start) * 1000
+        intent = "error"
+        if response.status_code == 200:
+            body = response.json()
+            intent = body["parsed"]["intent"] if len(body.get("plan", [])) <= 1 else "multi_intent"
+        return Sample(
+            prompt=prompt,
+            intent=intent,
+            status=response.status_code,
+            latency_ms=latency_ms,
+            stages=parse_server_timing(response.headers.get("Server-Timing")),
+        )
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as executor:
+        return list(executor.map(send, range(total)))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark /query end to end against local fakes of Google and Ollama")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--endpoint", default="/query")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--intent-engine", default="keyword", help="'keyword' needs no model weights")
+    parser.add_argument("--classify-ms", type=float, default=20.0, help="Simulated cost of the keyword engine")
+    parser.add_argument("--google-latency-ms", type=float, default=40.0)
+    parser.add_argument("--google-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--search-results", type=int, default=5)
+    parser.add_argument("--snippet-chars", type=int, default=200)
+    parser.add_argument("--body-chars", type=int, default=2000)
+    parser.add_argument("--llm-latency-ms", type=float, default=150.0, help="Time to first token")
+    parser.add_argument("--llm-chunk-ms", type=float, default=5.0, help="Time between streamed chunks")
+    parser.add_argument("--summary-chars", type=int, default=300)
+    parser.add_argument("--output", help="Where to write the JSON results (default: bench/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Earlier results to compare against; exits 1 on a regression")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    google = FakeGoogleServer(FakeGoogleConfig(
+        latency_ms=args.google_latency_ms,
+        jitter_ms=args.google_jitter_ms,
+        messages=args.messages,
+        events=args.events,
+        tasks=args.tasks,
+        search_results=args.search_results,
+        snippet_chars=args.snippet_chars,
+        body_chars=args.body_chars,
+    )).start()
+    ollama = OllamaStubServer(
+        make_llm_responder(args.summary_chars),
+        latency=args.llm_latency_ms / 1000,
+        chunk_latency=args.llm_chunk_ms / 1000,
+    ).start()
+    configure_environment(google.url, ollama.url, args)
+    from ai.compare_intent_engines import load_prompts
+
+    prompts = load_prompts()
+    server, thread, base_url = start_app()
+    try:
+        url = base_url + args.endpoint
+        run_load(url, prompts, args.warmup, args.concurrency, args.timeout)
+        google_before, ollama_before = google.request_count, len(ollama.requests)
+        start = time.perf_counter()
+        samples = run_load(url, prompts, args.requests, args.concurrency, args.timeout)
+        duration = time.perf_counter() - start
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        google.stop()
+        ollama.stop()
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    report = build_report(samples, duration, config)
+    report["started_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    report["google_requests"] = google.request_count - google_before
+    report["llm_requests"] = len(ollama.requests) - ollama_before
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_reports(report, json.load(f), args.max_regression, args.min_delta_ms)
+    print(json.dumps({
+        "output": output,
+        "overall": report["overall"],
+        "errors": report["errors"],
+        "per_intent": {intent: stats["p95_ms"] for intent, stats in report["per_intent"].items()},
+        "per_stage": {stage: stats["p95_ms"] for stage, stats in report["per_stage"].items()},
+        "regressions": regressions,
+    }, indent=2))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
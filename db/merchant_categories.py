@@ -0,0 +1,42 @@
+import re
+from typing import Any, Dict, Iterable, Tuple
+
+from pymongo import UpdateOne
+
+from db.mongo_client import get_database
+from db.transaction_ledger import recategorise_processed_transactions
+
+MERCHANT_CATEGORIES_COLLECTION = "merchant_categories"
+
+def normalise_description(description: str) -> str:
+    text = re.sub(r"[^A-Z ]+", " ", str(description).upper())
+    return re.sub(r"\s+", " ", text).strip()
+
+def get_merchant_categories(merchant_keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    db = get_database()
+    cursor = db[MERCHANT_CATEGORIES_COLLECTION].find({"_id": {"$in": list(merchant_keys)}})
+    return {doc["_id"]: doc for doc in cursor}
+
+def set_merchant_categories(categories: Dict[str, Tuple[str, float]], source: str = "model"):
+    if not categories:
+        return
+    operations = [
+        UpdateOne(
+            {"_id": merchant_key},
+            {"$setOnInsert": {"category": category, "confidence": confidence, "source": source}},
+            upsert=True,
+        )
+        for merchant_key, (category, confidence) in categories.items()
+    ]
+    db = get_database()
+    db[MERCHANT_CATEGORIES_COLLECTION].bulk_write(operations, ordered=False)
+
+def set_merchant_category_override(description: str, category: str):
+    merchant_key = normalise_description(description)
+    db = get_database()
+    db[MERCHANT_CATEGORIES_COLLECTION].update_one(
+        {"_id": merchant_key},
+        {"$set": {"category": category, "confidence": 1.0, "source": "user"}},
+        upsert=True,
+    )
+    recategorise_processed_transactions(merchant_key, category)
@@ -0,0 +1,40 @@
+from typing import Any, Dict, Iterable, Optional
+
+from pymongo import UpdateOne
+
+from db.mongo_client import get_database
+
+SHEET_SYNC_STATE_COLLECTION = "sheet_sync_state"
+SHEET_ROW_HASHES_COLLECTION = "sheet_row_hashes"
+
+def get_sheet_sync_state(sheet_key: str) -> Optional[Dict[str, Any]]:
+    db = get_database()
+    return db[SHEET_SYNC_STATE_COLLECTION].find_one({"_id": sheet_key})
+
+def set_sheet_sync_state(sheet_key: str, **fields):
+    db = get_database()
+    db[SHEET_SYNC_STATE_COLLECTION].update_one({"_id": sheet_key}, {"$set": fields}, upsert=True)
+
+def get_synced_row_hashes(sheet_key: str, hashes: Iterable[str]) -> set:
+    ids = [f"{sheet_key}:{row_hash}" for row_hash in hashes]
+    db = get_database()
+    cursor = db[SHEET_ROW_HASHES_COLLECTION].find({"_id": {"$in": ids}}, {"row_hash": 1})
+    return {doc["row_hash"] for doc in cursor}
+
+def record_synced_rows(sheet_key: str, hashes: Iterable[str], high_water_mark: str):
+    operations = [
+        UpdateOne(
+            {"_id": f"{sheet_key}:{row_hash}"},
+            {"$setOnInsert": {"sheet_key": sheet_key, "row_hash": row_hash}},
+            upsert=True,
+        )
+        for row_hash in hashes
+    ]
+    db = get_database()
+    if operations:
+        db[SHEET_ROW_HASHES_COLLECTION].bulk_write(operations, ordered=False)
+    db[SHEET_SYNC_STATE_COLLECTION].update_one(
+        {"_id": sheet_key},
+        {"$max": {"high_water_mark": high_water_mark}, "$set": {"resume_at_mark": True}},
+        upsert=True,
+    )
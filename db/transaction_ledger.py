@@ -0,0 +1,57 @@
+import hashlib
+import json
+import math
+import numbers
+import re
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Tuple
+
+import pandas as pd
+from pymongo import UpdateOne
+
+from db.mongo_client import get_database
+
+TRANSACTION_LEDGER_COLLECTION = "processed_transactions"
+LEDGER_EXCLUDED_FIELDS = {"Category", "Confidence"}
+# CSV statements keep timestamps as text; XLSX ones give datetimes
+DATETIME_TEXT = re.compile(r"^(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)$")
+
+def _canonical_value(value: Any) -> str:
+    # The pandas CSV reader and the openpyxl XLSX reader type the same cell
+    # differently (12.0 vs 12, nan vs None), so both must hash alike.
+    if value is None or value is pd.NaT:
+        return ""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, numbers.Number):
+        number = float(value)
+        if math.isnan(number):
+            return ""
+        return str(int(number)) if number.is_integer() else repr(number)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    text = str(value).strip()
+    return DATETIME_TEXT.sub(r"\1T\2", text)
+
+def transaction_hash(row: Dict[str, Any]) -> str:
+    fields = {key: _canonical_value(value) for key, value in row.items() if key not in LEDGER_EXCLUDED_FIELDS}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+def get_processed_transactions(hashes: Iterable[str]) -> Dict[str, str]:
+    db = get_database()
+    cursor = db[TRANSACTION_LEDGER_COLLECTION].find({"_id": {"$in": list(hashes)}}, {"category": 1})
+    return {doc["_id"]: doc["category"] for doc in cursor}
+
+def record_processed_transactions(categories: Dict[str, Tuple[str, str]]):
+    if not categories:
+        return
+    operations = [
+        UpdateOne({"_id": txn_hash}, {"$setOnInsert": {"category": category, "merchant_key": merchant_key}}, upsert=True)
+        for txn_hash, (category, merchant_key) in categories.items()
+    ]
+    db = get_database()
+    db[TRANSACTION_LEDGER_COLLECTION].bulk_write(operations, ordered=False)
+
+def recategorise_processed_transactions(merchant_key: str, category: str):
+    db = get_database()
+    db[TRANSACTION_LEDGER_COLLECTION].update_many({"merchant_key": merchant_key}, {"$set": {"category": category}})
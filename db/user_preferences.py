@@ -1,10 +1,80 @@
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from cachetools import TTLCache
+from pymongo.errors import PyMongoError
+
 from db.mongo_client import get_database
 
-def get_user_preference(user_id: str, pref_key: str):
+PREFERENCES_COLLECTION = "user_preferences"
+PREFERENCES_CACHE_TTL = float(os.environ.get("PREFERENCES_CACHE_TTL", "60"))
+PREFERENCES_CACHE_SIZE = int(os.environ.get("PREFERENCES_CACHE_SIZE", "1024"))
+PREFERENCES_CHANGE_STREAM = os.environ.get("PREFERENCES_CHANGE_STREAM", "0") == "1"
+
+_cache: TTLCache = TTLCache(maxsize=PREFERENCES_CACHE_SIZE, ttl=PREFERENCES_CACHE_TTL)
+_cache_lock = threading.Lock()
+
+def _get_user_doc(user_id: str) -> Dict[str, Any]:
+    with _cache_lock:
+        doc = _cache.get(user_id)
+    if doc is not None:
+        return doc
     db = get_database()
-    doc = db["user_preferences"].find_one({"user_id": user_id})
-    return doc.get(pref_key) if doc and pref_key in doc else None
+    doc = db[PREFERENCES_COLLECTION].find_one({"user_id": user_id}, {"_id": 0}) or {}
+    with _cache_lock:
+        _cache[user_id] = doc
+    return doc
+
+def get_user_preference(user_id: str, pref_key: str):
+    doc = _get_user_doc(user_id)
+    return doc.get(pref_key) if pref_key in doc else None
+
+def get_user_preferences(user_id: str, pref_keys: Iterable[str]) -> Dict[str, Any]:
+    doc = _get_user_doc(user_id)
+    return {key: doc.get(key) for key in pref_keys}
 
 def set_user_preference(user_id: str, pref_key: str, pref_value):
+    set_user_preferences(user_id, {pref_key: pref_value})
+
+def set_user_preferences(user_id: str, prefs: Dict[str, Any]):
     db = get_database()
-    db["user_preferences"].update_one({"user_id": user_id}, {"$set": {pref_key: pref_value}}, upsert=True)
+    db[PREFERENCES_COLLECTION].update_one({"user_id": user_id}, {"$set": prefs}, upsert=True)
+    invalidate_user_preferences(user_id)
+
+def invalidate_user_preferences(user_id: Optional[str] = None):
+    with _cache_lock:
+        if user_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(user_id, None)
+
+def watch_preference_changes(stop_event: threading.Event):
+    collection = get_database()[PREFERENCES_COLLECTION]
+    resume_token = None
+    while not stop_event.is_set():
+        try:
+            with collection.watch(full_document="updateLookup", resume_after=resume_token, max_await_time_ms=1000) as stream:
+                while not stop_event.is_set():
+                    change = stream.try_next()
+                    if change is None:
+                        continue
+                    resume_token = stream.resume_token
+                    user_id = (change.get("fullDocument") or {}).get("user_id")
+                    invalidate_user_preferences(user_id)
+        except PyMongoError as e:
+            logging.warning(f"Preference change stream unavailable, relying on TTL only: {e}")
+            return
+
+def start_preference_change_listener() -> Optional[threading.Event]:
+    if not PREFERENCES_CHANGE_STREAM:
+        return None
+    stop_event = threading.Event()
+    threading.Thread(
+        target=watch_preference_changes,
+        args=(stop_event,),
+        name="preferences-change-stream",
+        daemon=True,
+    ).start()
+    return stop_event
@@ -1,4 +1,5 @@
 import os
+import json
 import logging
 import re
 import requests
@@ -8,6 +9,10 @@ import pyttsx3
 logging.basicConfig(level=logging.INFO)
 
 SERVER_URL = os.getenv("SERVER_URL", "http://localhost:8012/process")
+SERVER_STREAM_URL = os.getenv("SERVER_STREAM_URL", "http://localhost:8012/query/stream")
+STREAM_CONNECT_TIMEOUT = float(os.getenv("STREAM_CONNECT_TIMEOUT", "5"))
+STREAM_READ_TIMEOUT = float(os.getenv("STREAM_READ_TIMEOUT", "120"))
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
 
 WAKE_WORDS = [
     "hey orianna",
@@ -82,6 +87,73 @@ def send_to_server(user_text):
         logging.error("Server response is not in JSON format.")
     return None
 
+def stream_from_server(user_text):
+    try:
+        with requests.post(
+            SERVER_STREAM_URL,
+            json=user_text,
+            stream=True,
+            timeout=(STREAM_CONNECT_TIMEOUT, STREAM_READ_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    yield json.loads(line)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error streaming from server: {e}")
+    except ValueError:
+        logging.error("Server sent an event that is not JSON.")
+
+def speak_stream(user_text):
+    # Summary tokens are buffered per step, since concurrent steps interleave
+    # them. One step at a time is spoken sentence by sentence as it streams;
+    # every other step's buffer is spoken when that step's result lands.
+    buffers = {}
+    live = None
+    spoke = False
+    for event in stream_from_server(user_text):
+        kind = event.get("event")
+        step = event.get("step", event.get("tool"))
+        if kind == "intent":
+            logging.info(f"Intent: {event.get('parsed', {}).get('intent')}")
+        elif kind == "summary_token":
+            buffers[step] = buffers.get(step, "") + event.get("text", "")
+            if live is None:
+                live = step
+            if step == live:
+                *sentences, buffers[step] = SENTENCE_END.split(buffers[step])
+                for sentence in sentences:
+                    speak_text(sentence)
+                    spoke = True
+        elif kind == "tool_result":
+            if step in buffers:
+                remaining = buffers.pop(step)
+                if remaining.strip():
+                    speak_text(remaining)
+                    spoke = True
+            else:
+                result = event.get("result", {})
+                message = result.get("summary") or result.get("message")
+                if message:
+                    logging.info(f"Orianna says: {message}")
+                    speak_text(message)
+                    spoke = True
+            if step == live:
+                live = None
+        elif kind == "decision":
+            for remaining in buffers.values():
+                if remaining.strip():
+                    speak_text(remaining)
+                    spoke = True
+            if not spoke:
+                speak_text(event.get("decision", {}).get("summary", "No response from server."))
+            return True
+        elif kind == "error":
+            logging.error(f"Server error: {event.get('message')}")
+            speak_text("Sorry, something went wrong.")
+            return True
+    return spoke
+
 def listen_for_wake_word(wake_words=WAKE_WORDS):
     recognizer = sr.Recognizer()
     with sr.Microphone() as source:
@@ -112,11 +184,7 @@ def voice_activation_loop():
             if command:
                 logging.info(f"Command recorded: {command}")
                 speak_text("Of course Louis")
-                server_response = send_to_server(command)
-                if server_response:
-                    decision_message = server_response.get("decision", {}).get("summary", "No response from server.")
-                    logging.info(f"Orianna says: {decision_message}")
-                    speak_text(decision_message)
+                if speak_stream(command):
                     speak_text("Is there anything else I can help you with?")
                 else:
                     logging.error("No response from server.")
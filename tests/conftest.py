@@ -0,0 +1,19 @@
+import mongomock
+import pytest
+from mongomock.collection import BulkOperationBuilder
+
+from db import mongo_client
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    # pymongo 4.11 passes ReplaceOne(sort=...) through bulk_write; mongomock 4.3 predates it
+    add_replace = BulkOperationBuilder.add_replace
+
+    def add_replace_without_sort(self, *args, sort=None, **kwargs):
+        return add_replace(self, *args, **kwargs)
+
+    monkeypatch.setattr(BulkOperationBuilder, "add_replace", add_replace_without_sort)
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(mongo_client, "_client", client)
+    return client[mongo_client.DB_NAME]
@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from tools.fast_extraction import to_rfc3339
+from tools.google_calendar_tool import GoogleCalendarTool
+
+
+@pytest.fixture
+def tool():
+    return GoogleCalendarTool()
+
+
+@pytest.mark.parametrize("phrase", ["next Friday 3pm", "this Saturday 7am"])
+def test_next_weekday_with_time_resolves_to_a_future_date(tool, phrase):
+    fast = tool._fast_extract(f"Add a meeting {phrase} called 'Planning'")
+
+    assert fast.confidence >= 0.8
+    assert fast.params["start_time"] == to_rfc3339(phrase)
+    start = datetime.fromisoformat(fast.params["start_time"].replace("Z", "+00:00"))
+    assert start > datetime.now(timezone.utc)
+
+
+def test_parse_date_rejects_unparseable_text(tool):
+    with pytest.raises(ValueError):
+        tool._parse_date("sometime soonish", datetime.now(timezone.utc))
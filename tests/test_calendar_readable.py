@@ -0,0 +1,22 @@
+import pytest
+
+from tools.google_calendar_tool import GoogleCalendarTool
+
+
+@pytest.fixture
+def tool():
+    return GoogleCalendarTool()
+
+
+def test_all_day_event_is_readable(tool):
+    assert tool._convert_to_readable({"date": "2024-03-01"}) == "Friday, March 01, 2024 (all day)"
+
+
+def test_timed_event_uses_its_time_zone(tool):
+    readable = tool._convert_to_readable({"dateTime": "2024-03-01T09:30:00Z", "timeZone": "Europe/Dublin"})
+    assert readable == "Friday, March 01, 2024 at 09:30 AM"
+
+
+def test_summaries_include_all_day_events(tool):
+    summary = tool._get_event_summaries([{"summary": "Holiday", "start": {"date": "2024-03-01"}, "end": {"date": "2024-03-02"}}])
+    assert "Holiday at Friday, March 01, 2024 (all day)" in summary
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+from tools.calendar_store import CalendarStore
+
+
+class FakeRequest:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+class FakeEvents:
+    def __init__(self, items):
+        self.items = items
+        self.calls = []
+
+    def list(self, **params):
+        self.calls.append(params)
+        return FakeRequest({"items": self.items, "nextSyncToken": "token"})
+
+
+class FakeService:
+    def __init__(self, items):
+        self._events = FakeEvents(items)
+
+    def events(self):
+        return self._events
+
+
+def test_full_sync_is_bounded_to_a_window(mongo):
+    service = FakeService([])
+    store = CalendarStore()
+    store.sync(service, "primary")
+
+    [params] = service.events().calls
+    time_min = datetime.fromisoformat(params["timeMin"].replace("Z", "+00:00"))
+    time_max = datetime.fromisoformat(params["timeMax"].replace("Z", "+00:00"))
+    now = datetime.now(timezone.utc)
+    assert now - timedelta(days=31) < time_min < now - timedelta(days=29)
+    assert now + timedelta(days=364) < time_max < now + timedelta(days=366)
+
+    assert store.covers(now, now + timedelta(days=7), ["primary"])
+    assert not store.covers(now, now + timedelta(days=400), ["primary"])
+    assert not store.covers(now, now + timedelta(days=7), ["primary", "other"])
+
+
+def test_incremental_sync_sends_no_window(mongo):
+    service = FakeService([])
+    store = CalendarStore()
+    store.sync(service, "primary")
+    store.sync(service, "primary", force=True)
+
+    incremental = service.events().calls[-1]
+    assert incremental["syncToken"] == "token"
+    assert "timeMin" not in incremental and "timeMax" not in incremental
+
+
+def _event(event_id, day):
+    return {
+        "id": event_id,
+        "summary": event_id,
+        "start": {"dateTime": f"2030-01-{day:02d}T09:00:00Z"},
+        "end": {"dateTime": f"2030-01-{day:02d}T10:00:00Z"},
+    }
+
+
+def test_full_resync_never_empties_the_calendar(mongo, monkeypatch):
+    store = CalendarStore()
+    store.sync(FakeService([_event("kept", 1), _event("stale", 2)]), "primary")
+    mongo["calendar_sync_state"].update_one({"_id": "primary"}, {"$unset": {"sync_token": ""}})
+
+    seen_during_sync = []
+    apply = CalendarStore._apply
+
+    def recording_apply(self, calendar_id, items):
+        seen_during_sync.append(self.events.count_documents({"calendar_id": calendar_id}))
+        apply(self, calendar_id, items)
+
+    monkeypatch.setattr(CalendarStore, "_apply", recording_apply)
+    store.sync(FakeService([_event("kept", 1), _event("new", 3)]), "primary", force=True)
+
+    assert seen_during_sync == [2]
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    assert [event["id"] for event in store.events_between(start, start + timedelta(days=7))] == ["kept", "new"]
@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from tools import base_tool, extraction_cache as cache_module
+from tools.base_tool import BaseTool
+from tools.extraction_cache import ExtractionCache, time_bucket
+
+
+class EchoTool(BaseTool):
+    def __init__(self, results):
+        self.results = list(results)
+        self.prompts = []
+
+    def get_name(self):
+        return "echo_tool"
+
+    def can_handle_intent(self, intent):
+        return True
+
+    def parse_and_execute(self, user_input, **kwargs):
+        return {}
+
+    def get_system_prompt(self):
+        return "Extract."
+
+    def _call_llm(self, final_prompt, **kwargs):
+        self.prompts.append(final_prompt)
+        return self.results.pop(0)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ExtractionCache(maxsize=2, ttl=60, use_mongo=False)
+    monkeypatch.setattr(base_tool, "extraction_cache", cache)
+    monkeypatch.setattr(base_tool, "EXTRACTION_CACHE_ENABLED", True)
+    return cache
+
+
+def test_key_ignores_case_spacing_quotes_and_trailing_punctuation():
+    assert ExtractionCache.make_key("gmail_tool", "  Check   emails from ‘Anna’!") == ExtractionCache.make_key(
+        "gmail_tool", "check emails from 'anna'"
+    )
+    assert ExtractionCache.make_key("gmail_tool", "hi")[:2] == ("gmail_tool", "hi")
+    assert ExtractionCache.make_key("gmail_tool", "hi") != ExtractionCache.make_key("tasks_tool", "hi")
+
+
+@pytest.mark.parametrize("text", [
+    "Remind me now",
+    "Add a task to call Anna in half an hour",
+    "Create an event in a couple of hours",
+    "Schedule it in an hour and a half",
+    "Call Tom in 90 mins",
+    "Book the room two hours from now",
+    "Ping me in a bit",
+])
+def test_time_sensitive_text_is_never_cached(text):
+    assert ExtractionCache.make_key("tasks_tool", text) is None
+
+
+@pytest.mark.parametrize("text", ["Add a task for tomorrow at 3pm", "Book a 30 minute meeting on Friday", "Remind me in 2 days"])
+def test_day_relative_text_is_cached(text):
+    assert ExtractionCache.make_key("tasks_tool", text) is not None
+
+
+def test_bucket_and_prompt_use_the_local_date(cache, monkeypatch):
+    # 23:30 UTC in Irish summer time is already the next day locally
+    late_evening_utc = datetime(2024, 6, 1, 23, 30, tzinfo=timezone.utc)
+    assert time_bucket(late_evening_utc, "day") == "2024-06-02"
+
+    monkeypatch.setattr(cache_module, "local_now", lambda: late_evening_utc.astimezone(cache_module.LOCAL_TIMEZONE))
+    monkeypatch.setattr(base_tool, "local_now", cache_module.local_now)
+    tool = EchoTool([{"title": "x"}])
+    tool._extract_params_via_llm("Add a task for tomorrow")
+    assert "Today is 2024-06-02T00:30:00+01:00." in tool.prompts[0]
+    [key] = list(cache._cache.keys())
+    assert key[2] == "2024-06-02"
+
+
+def test_error_results_are_not_cached(cache):
+    tool = EchoTool([{"error": "LLM output was not a JSON object"}, {"title": "Call Anna"}])
+
+    assert "error" in tool._extract_params_via_llm("Add a task to call Anna")
+    assert tool._extract_params_via_llm("Add a task to call Anna") == {"title": "Call Anna"}
+    assert tool._extract_params_via_llm("Add a task to call Anna") == {"title": "Call Anna"}
+    assert len(tool.prompts) == 2
+
+
+def test_stats_count_hits_misses_and_evictions(cache):
+    tool = EchoTool([{"n": 1}, {"n": 2}, {"n": 3}])
+    for text in ["one", "one", "two", "three"]:
+        tool._extract_params_via_llm(text)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 3, 1, 2)
+    assert stats["hit_rate"] == 0.25
+
+
+def test_mongo_tier_hits_are_counted_separately(mongo):
+    ExtractionCache(use_mongo=True).set(("tool", "text", "bucket"), {"n": 1})
+    fresh = ExtractionCache(use_mongo=True)
+
+    assert fresh.get(("tool", "text", "bucket")) == {"n": 1}
+    assert fresh.get(("tool", "text", "bucket")) == {"n": 1}
+    assert (fresh.stats()["mongo_hits"], fresh.stats()["hits"]) == (1, 1)
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+
+from tools.gmail_mirror import GmailMirror
+
+
+def _message(message_id, day):
+    return {
+        "_id": message_id,
+        "account": "me",
+        "label_ids": ["INBOX"],
+        "from": "anna@example.com",
+        "from_lower": "anna@example.com",
+        "subject": "Hello",
+        "subject_lower": "hello",
+        "snippet": "",
+        "internal_date": datetime(2024, 3, day, tzinfo=timezone.utc),
+    }
+
+
+def _mirror(mongo, covered_since):
+    mongo["gmail_messages"].insert_many([_message("a", 10), _message("b", 20)])
+    mongo["gmail_sync_state"].insert_one({"_id": "me", "history_id": "1", "covered_since": covered_since})
+    return GmailMirror(fetch_messages=lambda service, ids, fmt: [])
+
+
+def test_truncated_mirror_defers_older_ranges_to_the_api(mongo):
+    mirror = _mirror(mongo, datetime(2024, 3, 10, tzinfo=timezone.utc))
+
+    assert mirror.query("INBOX", max_results=5) is None
+    assert mirror.query("INBOX", max_results=5, after=datetime(2024, 3, 1, tzinfo=timezone.utc)) is None
+    assert [email["id"] for email in mirror.query("INBOX", max_results=5, after=datetime(2024, 3, 15, tzinfo=timezone.utc))] == ["b"]
+    # Enough recent matches: nothing older could make the cut
+    assert [email["id"] for email in mirror.query("INBOX", max_results=1)] == ["b"]
+
+
+def test_complete_mirror_answers_every_range(mongo):
+    mirror = _mirror(mongo, None)
+
+    assert [email["id"] for email in mirror.query("INBOX", max_results=5)] == ["b", "a"]
+
+
+class FakeRequest:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+class FakeGmail:
+    def __init__(self, messages):
+        self.messages_by_id = {msg["id"]: msg for msg in messages}
+
+    def users(self):
+        return self
+
+    def getProfile(self, userId):
+        return FakeRequest({"historyId": "42"})
+
+    def messages(self):
+        return self
+
+    def list(self, userId, maxResults, includeSpamTrash=False, pageToken=None):
+        ids = [
+            message_id for message_id, msg in self.messages_by_id.items()
+            if includeSpamTrash or not {"SPAM", "TRASH"} & set(msg["labelIds"])
+        ]
+        return FakeRequest({"messages": [{"id": message_id} for message_id in ids]})
+
+    def fetch(self, service, message_ids, message_format):
+        return [self.messages_by_id[message_id] for message_id in message_ids]
+
+
+def _api_message(message_id, labels, day):
+    return {
+        "id": message_id,
+        "labelIds": labels,
+        "snippet": "",
+        "internalDate": str(int(datetime(2024, 3, day, tzinfo=timezone.utc).timestamp() * 1000)),
+        "payload": {"headers": [{"name": "From", "value": "promo@example.com"}, {"name": "Subject", "value": "Win"}]},
+    }
+
+
+def test_full_sync_mirrors_spam_so_spam_queries_are_answered(mongo):
+    gmail = FakeGmail([_api_message("inbox", ["INBOX"], 10), _api_message("spam", ["SPAM", "UNREAD"], 12)])
+    mongo["gmail_messages"].insert_one(_message("stale", 1))
+    mirror = GmailMirror(fetch_messages=gmail.fetch)
+    mirror.sync(gmail)
+
+    assert [email["id"] for email in mirror.query("SPAM", max_results=5, unread_only=True)] == ["spam"]
+    assert [email["id"] for email in mirror.query("INBOX", max_results=5)] == ["inbox"]
+    assert mongo["gmail_messages"].count_documents({"_id": "stale"}) == 0
+
+
+def test_mirror_built_without_spam_is_resynced(mongo):
+    gmail = FakeGmail([_api_message("spam", ["SPAM"], 12)])
+    mongo["gmail_sync_state"].insert_one({"_id": "me", "history_id": "1", "covered_since": None, "synced_at": 0})
+    mirror = GmailMirror(fetch_messages=gmail.fetch)
+    mirror.sync(gmail)
+
+    assert [email["id"] for email in mirror.query("SPAM", max_results=5)] == ["spam"]
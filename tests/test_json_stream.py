@@ -0,0 +1,20 @@
+from ai.json_stream import parse_json_object
+
+
+def test_python_literals_are_repaired_outside_strings():
+    assert parse_json_object('{"a": True, "b": None, "c": "say \\"True\\" here",}') == {
+        "a": True, "b": None, "c": 'say "True" here',
+    }
+
+
+def test_literal_after_escaped_quote_in_string_is_left_alone():
+    assert parse_json_object('{"c": "a \\" True", "d": False}') == {"c": 'a " True', "d": False}
+
+
+def test_surrounding_text_is_ignored():
+    assert parse_json_object('Sure! {"title": "Call John"} Hope that helps.') == {"title": "Call John"}
+
+
+def test_truncated_object_is_rejected():
+    assert parse_json_object('{"title": "Call Jo') is None
+    assert parse_json_object('{"title": "Call John", "due": ') is None
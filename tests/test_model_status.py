@@ -0,0 +1,27 @@
+import pytest
+
+from ai import model_status
+
+
+@pytest.fixture(autouse=True)
+def empty_status(monkeypatch):
+    monkeypatch.setattr(model_status, "_status", {})
+
+
+def test_lazy_model_does_not_gate_readiness():
+    with model_status.track_model_load("intent_engine:test"):
+        pass
+    with pytest.raises(RuntimeError):
+        with model_status.track_model_load("transactions:test", gates_readiness=False):
+            raise RuntimeError("download failed")
+
+    assert model_status.get_model_status()["transactions:test"]["state"] == "failed"
+    assert model_status.all_models_ready()
+
+
+def test_gating_model_still_blocks_readiness():
+    model_status.register_model("intent_engine:test")
+    with model_status.track_model_load("transactions:test", gates_readiness=False):
+        pass
+
+    assert not model_status.all_models_ready()
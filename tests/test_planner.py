@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from agent.executors import StageOverloaded
+
+from ai import planner
+from bench.keyword_intent_engine import KeywordIntentEngine
+
+
+async def run_inline(fn, *args):
+    return fn(*args)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = KeywordIntentEngine()
+    monkeypatch.setattr(planner, "get_intent_engine", lambda: engine)
+    return engine
+
+
+def test_sentence_punctuation_does_not_split():
+    assert planner.segment_clauses("Add a meeting with Anna on Friday. She wants to talk about the budget.") == [
+        "Add a meeting with Anna on Friday. She wants to talk about the budget.",
+    ]
+
+
+def test_sequence_markers_split():
+    assert planner.segment_clauses("Check my inbox, and then add a task to reply to Tom") == [
+        "Check my inbox", "add a task to reply to Tom",
+    ]
+
+
+def test_clause_without_its_own_intent_stays_with_previous_step(engine):
+    plan = planner.plan_user_input(
+        "Create a task to call John, then check my email, plus remember to be polite about it"
+    )
+
+    assert [step.intent for step in plan.steps] == ["create task", "check email"]
+    assert plan.steps[-1].text.endswith("remember to be polite about it")
+
+
+def test_steps_over_the_limit_are_reported(engine, monkeypatch):
+    monkeypatch.setattr(planner, "PLANNER_MAX_STEPS", 1)
+    monkeypatch.setattr(planner, "decide_next_action", lambda parsed: {"message": parsed["intent"]})
+    plan = planner.plan_user_input("Create a task to call John, then check my email")
+
+    assert [step.intent for step in plan.steps] == ["create task"]
+    assert [step.intent for step in plan.skipped] == ["check email"]
+
+    decision = asyncio.run(planner.execute_plan(plan, run_inline))
+    assert decision["skipped"] == [{"intent": "check email", "text": "check my email"}]
+    assert "check my email" in decision["message"]
+
+
+def test_refused_step_is_reported_once_another_has_run(engine, monkeypatch):
+    monkeypatch.setattr(planner, "decide_next_action", lambda parsed: {"message": f"done {parsed['intent']}"})
+    plan = planner.plan_user_input("Create a task to call John, then check my email")
+
+    async def run_first_only(fn, step):
+        if step.id:
+            raise StageOverloaded("tool", 2)
+        return fn(step)
+
+    decision = asyncio.run(planner.execute_plan(plan, run_first_only))
+    assert decision["steps"][0]["result"] == {"message": "done create task"}
+    assert decision["steps"][1]["result"]["action"] == "step_not_started"
+    assert decision["steps"][1]["result"]["retry_after"] == 2
+    assert decision["message"] == "Completed 1 of 2 actions."
+
+
+def test_request_fails_when_nothing_could_start(engine):
+    plan = planner.plan_user_input("Create a task to call John, then check my email")
+
+    async def refuse(fn, step):
+        raise StageOverloaded("tool", 2)
+
+    with pytest.raises(StageOverloaded):
+        asyncio.run(planner.execute_plan(plan, refuse))
@@ -0,0 +1,64 @@
+import json
+import threading
+import time
+
+from ai.llm_client import OllamaHTTPBackend
+from ai.ollama_stub import OllamaStubServer
+from tools.summarizer import Summarizer
+
+ITEMS = [{"title": "Call John. He asked twice"}, {"title": "Book the venue"}]
+
+
+def _summary_of(chunks):
+    return json.loads("".join(chunks))["summary"]
+
+
+def test_single_call_and_reduce_run_on_the_callers_thread():
+    caller = threading.current_thread()
+    threads = {}
+
+    def complete(prompt, timeout):
+        threads.setdefault("map", set()).add(threading.current_thread())
+        return "partial"
+
+    def final_complete(prompt, timeout):
+        threads.setdefault("final", []).append(threading.current_thread())
+        return "final"
+
+    summarizer = Summarizer(token_budget=10)
+    assert summarizer.summarize(["a" * 30, "b" * 30], "Summarise", complete, final_complete) == "final"
+    assert caller not in threads["map"]
+    assert summarizer.summarize("short", "Summarise", complete, final_complete) == "final"
+    assert threads["final"] == [caller, caller]
+
+
+def test_slow_llm_falls_back_to_an_extractive_summary_within_the_budget():
+    with OllamaStubServer(latency=3.0) as stub:
+        backend = OllamaHTTPBackend(base_url=stub.url)
+
+        def complete(prompt, timeout):
+            return _summary_of([backend.generate(prompt, format="json", timeout=timeout)])
+
+        start = time.monotonic()
+        summary = Summarizer(time_budget=0.5).summarize(ITEMS, "Summarise", complete)
+
+    assert time.monotonic() - start < 1.5
+    assert summary == "Call John. Book the venue."
+
+
+def test_late_map_chunks_stop_and_free_their_llm_slots():
+    with OllamaStubServer(stream_chunk_size=1, chunk_latency=0.05) as stub:
+        backend = OllamaHTTPBackend(base_url=stub.url, max_concurrency=2, queue_timeout=0.1)
+
+        def complete(prompt, timeout):
+            return _summary_of(backend.stream(prompt, format="json", timeout=timeout))
+
+        start = time.monotonic()
+        summary = Summarizer(token_budget=10, time_budget=0.4).summarize(ITEMS, "Summarise", complete)
+        elapsed = time.monotonic() - start
+        # Both slots are free again shortly after the budget, not when the streams would have ended
+        time.sleep(0.2)
+        assert backend._slots.acquire(timeout=0) and backend._slots.acquire(timeout=0)
+
+    assert elapsed < 1.0
+    assert summary == "Call John. Book the venue."
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from openpyxl import Workbook
+
+from db.transaction_ledger import transaction_hash
+from tools.statement_io import iter_statement_chunks
+
+HEADER = ["Type", "Started Date", "Description", "Amount", "Fee", "Balance"]
+ROW = ["CARD_PAYMENT", datetime(2024, 3, 1, 12, 30, 5), "Coffee", -3, 0, None]
+
+
+def _rows(path):
+    return [row for chunk in iter_statement_chunks(path) for row in chunk.to_dict("records")]
+
+
+def test_same_row_hashes_alike_through_csv_and_xlsx(tmp_path):
+    xlsx_path = tmp_path / "statement.xlsx"
+    workbook = Workbook()
+    workbook.active.append(HEADER)
+    workbook.active.append(ROW)
+    workbook.save(xlsx_path)
+
+    csv_path = tmp_path / "statement.csv"
+    csv_path.write_text(",".join(HEADER) + "\nCARD_PAYMENT,2024-03-01 12:30:05,Coffee,-3.0,0.0,\n")
+
+    [xlsx_row] = _rows(str(xlsx_path))
+    [csv_row] = _rows(str(csv_path))
+    assert transaction_hash(xlsx_row) == transaction_hash(csv_row)
+
+
+def test_fractional_amounts_still_differ():
+    assert transaction_hash({"Amount": 3.5}) != transaction_hash({"Amount": 3})
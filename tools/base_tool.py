@@ -1,10 +1,46 @@
-import json
-import subprocess
-from datetime import datetime, timezone
+import os
+import time
+from contextlib import closing
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from ai.events import emit, is_streaming
+from ai.json_stream import IncrementalJsonObjectParser, JsonStringFieldStreamer
+from ai.llm_client import JsonFormat, get_llm_client
+from ai.timings import timed
+from tools.extraction_cache import EXTRACTION_CACHE_ENABLED, extraction_cache, local_now
+from tools.summarizer import SUMMARY_NUM_PREDICT, summarizer
+from tools.fast_extraction import (
+    FAST_EXTRACTION_ENABLED,
+    FAST_EXTRACTION_MIN_CONFIDENCE,
+    FastExtraction,
+    extraction_stats,
+)
+
+EXTRACTION_NUM_PREDICT = int(os.environ.get("EXTRACTION_NUM_PREDICT", "200"))
+EXTRACTION_RETRIES = int(os.environ.get("EXTRACTION_RETRIES", "1"))
+
+EXTRACTION_OPTIONS = {"num_predict": EXTRACTION_NUM_PREDICT, "temperature": 0}
+SUMMARY_OPTIONS = {"num_predict": SUMMARY_NUM_PREDICT}
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {"summary": {"type": "string"}},
+    "required": ["summary"],
+}
+
+@lru_cache(maxsize=None)
+def _json_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    return model.model_json_schema()
 
 class BaseTool(ABC):
+    # Fields of each result item worth summarising; None keeps them all
+    summary_fields: Optional[List[str]] = None
+    # Pydantic model the extraction output must match; constrains LLM decoding
+    extraction_model: Optional[Type[BaseModel]] = None
+
     @abstractmethod
     def get_name(self) -> str:
         pass
@@ -22,36 +58,103 @@ class BaseTool(ABC):
         pass
 
     def _summarize_via_llm(self, data: Any, summary_prompt: str, model_name="dolphin3") -> str:
-        if not isinstance(data, str):
-            input_str = json.dumps(data, ensure_ascii=False)
-        else:
-            input_str = data
+        def complete(prompt: str, timeout: float) -> Optional[str]:
+            return self._call_llm(prompt, model_name=model_name, options=SUMMARY_OPTIONS, format=SUMMARY_SCHEMA, timeout=timeout).get("summary")
+
+        def final_complete(prompt: str, timeout: float) -> Optional[str]:
+            if is_streaming():
+                return self._stream_summary(prompt, model_name=model_name, timeout=timeout)
+            return complete(prompt, timeout)
 
-        final_prompt = f"{summary_prompt}\n\nData: {input_str}"
         try:
-            response = self._call_llm(final_prompt, model_name=model_name)
-            return response.get("summary", "Summarization failed.")
+            with timed("summarize"):
+                return summarizer.summarize(data, summary_prompt, complete, final_complete, fields=self.summary_fields)
         except Exception as e:
             return f"Summarization error: {str(e)}"
-        
+
+    def _stream_summary(self, final_prompt: str, model_name="dolphin3", timeout: Optional[float] = None) -> Optional[str]:
+        streamer = JsonStringFieldStreamer("summary")
+        with timed("llm"), closing(get_llm_client().stream(final_prompt, model_name=model_name, options=SUMMARY_OPTIONS, format=SUMMARY_SCHEMA, timeout=timeout)) as chunks:
+            for chunk in chunks:
+                text = streamer.feed(chunk)
+                if text:
+                    emit("summary_token", tool=self.get_name(), text=text)
+                if streamer.done:
+                    break
+        return streamer.value if streamer.done else None
+
+    def _fast_extract(self, user_text: str, intent: str = "") -> Optional[FastExtraction]:
+        return None
+
+    def _extract_params(self, user_text: str, intent: str = "") -> Dict[str, Any]:
+        with timed("extraction"):
+            fast = self._fast_extract(user_text, intent) if FAST_EXTRACTION_ENABLED else None
+            if fast is not None and fast.confidence >= FAST_EXTRACTION_MIN_CONFIDENCE:
+                extraction_stats.record(self.get_name(), fast_hit=True)
+                return fast.params
+            extraction_stats.record(self.get_name(), fast_hit=False)
+            return self._extract_params_via_llm(user_text)
+
     def _extract_params_via_llm(self, user_text: str, model_name="dolphin3") -> Dict[str, Any]:
+        cache_key = extraction_cache.make_key(self.get_name(), user_text) if EXTRACTION_CACHE_ENABLED else None
+        if cache_key is not None:
+            cached = extraction_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        result = self._extract_params_via_llm_uncached(user_text, model_name=model_name)
+        if cache_key is not None and "error" not in result:
+            extraction_cache.set(cache_key, result)
+        return result
+
+    def _extract_params_via_llm_uncached(self, user_text: str, model_name="dolphin3") -> Dict[str, Any]:
         system_prompt = self.get_system_prompt()
-        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        now = local_now().isoformat(timespec="seconds")
         final_prompt = (
             f"{system_prompt}\n"
             f"Today is {now}.\n"
             f"User text: {user_text}"
         )
-        return self._call_llm(final_prompt, model_name=model_name)
+        return self._call_llm(
+            final_prompt,
+            model_name=model_name,
+            options=EXTRACTION_OPTIONS,
+            format=_json_schema(self.extraction_model) if self.extraction_model else "json",
+            retries=EXTRACTION_RETRIES,
+        )
+
+    def _generate_json(
+        self,
+        final_prompt: str,
+        model_name: str,
+        options: Optional[Dict[str, Any]],
+        format: JsonFormat,
+        timeout: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        parser = IncrementalJsonObjectParser()
+        with timed("llm"), closing(get_llm_client().stream(final_prompt, model_name=model_name, options=options, format=format, timeout=timeout)) as chunks:
+            for chunk in chunks:
+                # Stop as soon as the object closes instead of waiting for the model to finish
+                if parser.feed(chunk):
+                    break
+        return parser.result()
 
-    def _call_llm(self, final_prompt: str, model_name="dolphin3") -> Dict[str, Any]:
-        cmd = ["ollama", "run", model_name, final_prompt]
+    def _call_llm(
+        self,
+        final_prompt: str,
+        model_name="dolphin3",
+        options: Optional[Dict[str, Any]] = None,
+        format: JsonFormat = "json",
+        retries: int = 0,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        # Retries share the one time budget
+        deadline = time.monotonic() + timeout if timeout is not None else None
         try:
-            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                    text=True, encoding="utf-8")
-            out, err = proc.communicate()
-            if err:
-                print("LLM error:", err)
-            return json.loads(out.strip())
+            for _ in range(retries + 1):
+                remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                result = self._generate_json(final_prompt, model_name, options, format, timeout=remaining)
+                if result is not None:
+                    return result
+            return {"error": "LLM output was not a JSON object"}
         except Exception as e:
             return {"error": str(e)}
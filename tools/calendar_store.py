@@ -0,0 +1,195 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from googleapiclient.errors import HttpError
+from pymongo import ASCENDING, ReplaceOne
+
+from db.mongo_client import get_database
+
+CALENDAR_STORE_ENABLED = os.environ.get("CALENDAR_STORE_ENABLED", "0") == "1"
+CALENDAR_STORE_SYNC_INTERVAL = float(os.environ.get("CALENDAR_STORE_SYNC_INTERVAL", "60"))
+# Full syncs expand recurring events, so they only cover this window around now
+CALENDAR_STORE_PAST_DAYS = int(os.environ.get("CALENDAR_STORE_PAST_DAYS", "30"))
+CALENDAR_STORE_FUTURE_DAYS = int(os.environ.get("CALENDAR_STORE_FUTURE_DAYS", "365"))
+
+EVENTS_COLLECTION = "calendar_events"
+STATE_COLLECTION = "calendar_sync_state"
+DEFAULT_TIMEZONE = "Europe/Dublin"
+
+def _as_utc(value: datetime) -> datetime:
+    # pymongo hands back naive datetimes that are already UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def event_bounds(event: Dict[str, Any]) -> Tuple[datetime, datetime]:
+    bounds = []
+    for key in ("start", "end"):
+        info = event.get(key, {})
+        if info.get("dateTime"):
+            bounds.append(_as_utc(datetime.fromisoformat(info["dateTime"].replace("Z", "+00:00"))))
+        else:
+            day = datetime.fromisoformat(info["date"])
+            bounds.append(_as_utc(day.replace(tzinfo=ZoneInfo(info.get("timeZone", DEFAULT_TIMEZONE)))))
+    return bounds[0], bounds[1]
+
+class CalendarStore:
+    def __init__(self) -> None:
+        self._sync_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._indexes_ready = False
+
+    @property
+    def events(self):
+        return get_database()[EVENTS_COLLECTION]
+
+    @property
+    def state(self):
+        return get_database()[STATE_COLLECTION]
+
+    def ensure_indexes(self) -> None:
+        if self._indexes_ready:
+            return
+        self.events.create_index([("calendar_id", ASCENDING), ("start_ts", ASCENDING)])
+        self.events.create_index([("calendar_id", ASCENDING), ("end_ts", ASCENDING)])
+        self._indexes_ready = True
+
+    def is_fresh(self, calendar_id: str, max_age: float = CALENDAR_STORE_SYNC_INTERVAL) -> bool:
+        state = self.state.find_one({"_id": calendar_id})
+        return bool(state and state.get("sync_token") and state.get("window_start") and time.time() - state.get("synced_at", 0) < max_age)
+
+    def covers(self, start: datetime, end: datetime, calendar_ids: List[str]) -> bool:
+        # Outside the window of the last full sync the store is incomplete
+        states = list(self.state.find({"_id": {"$in": calendar_ids}}))
+        return len(states) == len(set(calendar_ids)) and all(
+            state.get("window_start") and _as_utc(state["window_start"]) <= _as_utc(start)
+            and state.get("window_end") and _as_utc(end) <= _as_utc(state["window_end"])
+            for state in states
+        )
+
+    def sync(self, service, calendar_id: str = "primary", force: bool = False) -> None:
+        self.ensure_indexes()
+        with self._locks_guard:
+            sync_lock = self._sync_locks.setdefault(calendar_id, threading.Lock())
+        with sync_lock:
+            if not force and self.is_fresh(calendar_id):
+                return
+            state = self.state.find_one({"_id": calendar_id})
+            # State saved before full syncs were windowed has no window: resync it once
+            if state and state.get("sync_token") and state.get("window_start"):
+                try:
+                    items, sync_token = self._list_events(service, calendar_id, state["sync_token"])
+                    self._apply(calendar_id, items)
+                    self._save_state(calendar_id, sync_token)
+                    return
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    logging.info(f"Calendar sync token for '{calendar_id}' expired, running full resync")
+            now = datetime.now(timezone.utc).replace(microsecond=0)
+            window = (now - timedelta(days=CALENDAR_STORE_PAST_DAYS), now + timedelta(days=CALENDAR_STORE_FUTURE_DAYS))
+            items, sync_token = self._list_events(service, calendar_id, window=window)
+            # Upsert first and prune after: reads don't take the sync lock and
+            # must never see an empty calendar
+            self._apply(calendar_id, items)
+            kept = [f"{calendar_id}:{event['id']}" for event in items if event.get("status") != "cancelled"]
+            self.events.delete_many({"calendar_id": calendar_id, "_id": {"$nin": kept}})
+            self._save_state(calendar_id, sync_token, window)
+
+    def _list_events(
+        self,
+        service,
+        calendar_id: str,
+        sync_token: Optional[str] = None,
+        window: Optional[Tuple[datetime, datetime]] = None,
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        items: List[Dict[str, Any]] = []
+        page_token = None
+        while True:
+            params = {"calendarId": calendar_id, "singleEvents": True, "maxResults": 2500}
+            if sync_token:
+                params["syncToken"] = sync_token
+            if window:
+                params["timeMin"], params["timeMax"] = (bound.isoformat().replace("+00:00", "Z") for bound in window)
+            if page_token:
+                params["pageToken"] = page_token
+            result = service.events().list(**params).execute()
+            items.extend(result.get("items", []))
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return items, result.get("nextSyncToken")
+
+    def _apply(self, calendar_id: str, items: List[Dict[str, Any]]) -> None:
+        cancelled = [f"{calendar_id}:{event['id']}" for event in items if event.get("status") == "cancelled"]
+        if cancelled:
+            self.events.delete_many({"_id": {"$in": cancelled}})
+        operations = [
+            ReplaceOne({"_id": f"{calendar_id}:{event['id']}"}, self._to_document(calendar_id, event), upsert=True)
+            for event in items
+            if event.get("status") != "cancelled"
+        ]
+        if operations:
+            self.events.bulk_write(operations, ordered=False)
+
+    def _save_state(
+        self,
+        calendar_id: str,
+        sync_token: Optional[str],
+        window: Optional[Tuple[datetime, datetime]] = None,
+    ) -> None:
+        update: Dict[str, Any] = {"sync_token": sync_token, "synced_at": time.time()}
+        if window:
+            update["window_start"], update["window_end"] = window
+        self.state.update_one({"_id": calendar_id}, {"$set": update}, upsert=True)
+
+    def _to_document(self, calendar_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        start_ts, end_ts = event_bounds(event)
+        return {
+            "_id": f"{calendar_id}:{event['id']}",
+            "calendar_id": calendar_id,
+            "start_ts": start_ts,
+            "end_ts": end_ts,
+            "event": event,
+        }
+
+    def upsert_event(self, calendar_id: str, event: Dict[str, Any]) -> None:
+        self.events.replace_one({"_id": f"{calendar_id}:{event['id']}"}, self._to_document(calendar_id, event), upsert=True)
+
+    def events_between(
+        self,
+        start: datetime,
+        end: datetime,
+        calendar_ids: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        criteria: Dict[str, Any] = {"start_ts": {"$lt": end}, "end_ts": {"$gt": start}}
+        if calendar_ids:
+            criteria["calendar_id"] = {"$in": calendar_ids}
+        cursor = self.events.find(criteria).sort("start_ts", ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        return [doc["event"] for doc in cursor]
+
+    def find_conflicts(self, start: datetime, end: datetime, calendar_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return self.events_between(start, end, calendar_ids)
+
+    def next_free_slot(
+        self,
+        after: datetime,
+        duration: timedelta,
+        until: datetime,
+        calendar_ids: Optional[List[str]] = None,
+    ) -> Optional[Tuple[datetime, datetime]]:
+        cursor = _as_utc(after)
+        until = _as_utc(until)
+        for event in self.events_between(cursor, until, calendar_ids):
+            start_ts, end_ts = event_bounds(event)
+            if start_ts - cursor >= duration:
+                return cursor, cursor + duration
+            cursor = max(cursor, end_ts)
+        if until - cursor >= duration:
+            return cursor, cursor + duration
+        return None
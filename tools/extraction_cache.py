@@ -0,0 +1,178 @@
+import copy
+import hashlib
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from cachetools import TTLCache
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+from db.mongo_client import get_database
+
+EXTRACTION_CACHE_ENABLED = os.environ.get("EXTRACTION_CACHE_ENABLED", "1") == "1"
+EXTRACTION_CACHE_SIZE = int(os.environ.get("EXTRACTION_CACHE_SIZE", "1024"))
+EXTRACTION_CACHE_TTL = float(os.environ.get("EXTRACTION_CACHE_TTL", "3600"))
+EXTRACTION_CACHE_BUCKET = os.environ.get("EXTRACTION_CACHE_BUCKET", "day")
+EXTRACTION_CACHE_MONGO = os.environ.get("EXTRACTION_CACHE_MONGO", "0") == "1"
+
+EXTRACTION_CACHE_COLLECTION = "extraction_cache"
+BUCKET_FORMATS = {"day": "%Y-%m-%d", "hour": "%Y-%m-%dT%H"}
+LOCAL_TIMEZONE = ZoneInfo("Europe/Dublin")
+
+# Phrasings relative to the current time of day resolve differently within a
+# bucket, so their extractions are never reused.
+_QUANTITY = (
+    r"(?:an?|half an?|a few|a couple(?:\s+of)?|couple of|several|\d+(?:\.\d+)?"
+    r"|one|two|three|four|five|six|seven|eight|nine|ten|fifteen|twenty|thirty|forty[- ]five|ninety)"
+)
+_UNIT = r"(?:secs?|seconds?|mins?|minutes?|hrs?|hours?)"
+TIME_SENSITIVE = re.compile(
+    r"\b(?:now|right away|asap|later|soon|shortly|this time"
+    r"|in\s+a\s+(?:bit|while|moment|sec(?:ond)?)"
+    rf"|in\s+{_QUANTITY}\s+{_UNIT}"
+    rf"|{_QUANTITY}\s+{_UNIT}\s+(?:from now|later))\b",
+    re.IGNORECASE,
+)
+
+CacheKey = Tuple[str, str, str]
+
+def normalise_text(text: str) -> str:
+    text = text.replace("’", "'").replace("‘", "'").replace("“", '"').replace("”", '"')
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip(" .!?")
+
+def local_now() -> datetime:
+    # The one clock for both the cache bucket and the "Today is" the LLM is told,
+    # so an extraction is never cached under a different day than it resolved
+    return datetime.now(LOCAL_TIMEZONE)
+
+def time_bucket(now: Optional[datetime] = None, granularity: str = EXTRACTION_CACHE_BUCKET) -> str:
+    now = (now or local_now()).astimezone(LOCAL_TIMEZONE)
+    return now.strftime(BUCKET_FORMATS.get(granularity, BUCKET_FORMATS["day"]))
+
+class _CountingTTLCache(TTLCache):
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.evictions = 0
+        self.expirations = 0
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.expirations += len(expired)
+        return expired
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+class ExtractionCache:
+    def __init__(
+        self,
+        maxsize: int = EXTRACTION_CACHE_SIZE,
+        ttl: float = EXTRACTION_CACHE_TTL,
+        use_mongo: bool = EXTRACTION_CACHE_MONGO,
+    ) -> None:
+        self.ttl = ttl
+        self.use_mongo = use_mongo
+        self._cache = _CountingTTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._mongo_hits = 0
+        self._misses = 0
+        self._indexes_ready = False
+
+    @staticmethod
+    def make_key(tool_name: str, user_text: str) -> Optional[CacheKey]:
+        if TIME_SENSITIVE.search(user_text):
+            return None
+        return tool_name, normalise_text(user_text), time_bucket()
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._hits += 1
+                return copy.deepcopy(value)
+        value = self._get_from_mongo(key) if self.use_mongo else None
+        with self._lock:
+            if value is None:
+                self._misses += 1
+                return None
+            self._mongo_hits += 1
+            self._cache[key] = value
+        return copy.deepcopy(value)
+
+    def set(self, key: CacheKey, value: Dict[str, Any]) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._cache[key] = value
+        if self.use_mongo:
+            self._set_in_mongo(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._mongo_hits + self._misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "hits": self._hits,
+                "mongo_hits": self._mongo_hits,
+                "misses": self._misses,
+                "evictions": self._cache.evictions,
+                "expirations": self._cache.expirations,
+                "hit_rate": (self._hits + self._mongo_hits) / max(1, lookups),
+            }
+
+    @property
+    def collection(self):
+        return get_database()[EXTRACTION_CACHE_COLLECTION]
+
+    @staticmethod
+    def _document_id(key: CacheKey) -> str:
+        return hashlib.sha256("\x1f".join(key).encode("utf-8")).hexdigest()
+
+    def _ensure_indexes(self) -> None:
+        if not self._indexes_ready:
+            self.collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+            self._indexes_ready = True
+
+    def _get_from_mongo(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        try:
+            doc = self.collection.find_one(
+                {"_id": self._document_id(key), "expires_at": {"$gt": datetime.now(timezone.utc)}},
+                {"value": 1},
+            )
+        except PyMongoError as e:
+            logging.warning(f"Extraction cache lookup in Mongo failed: {e}")
+            return None
+        return doc["value"] if doc else None
+
+    def _set_in_mongo(self, key: CacheKey, value: Dict[str, Any]) -> None:
+        tool_name, text, bucket = key
+        try:
+            self._ensure_indexes()
+            self.collection.replace_one(
+                {"_id": self._document_id(key)},
+                {
+                    "tool": tool_name,
+                    "text": text,
+                    "bucket": bucket,
+                    "value": value,
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.ttl),
+                },
+                upsert=True,
+            )
+        except PyMongoError as e:
+            logging.warning(f"Extraction cache write to Mongo failed: {e}")
+
+extraction_cache = ExtractionCache()
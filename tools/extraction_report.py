@@ -0,0 +1,76 @@
+import argparse
+import json
+from typing import List, Tuple
+
+from ai.compare_intent_engines import EXPECTED_INTENTS, load_prompts
+from ai.planner import segment_clauses
+from tools.fast_extraction import FAST_EXTRACTION_MIN_CONFIDENCE, extraction_stats
+from tools.tool_registry import get_registry
+
+# Intents whose flows extract parameters; listing events and tasks never calls the LLM.
+EXTRACTING_INTENTS = ["check email", "list emails", "read emails", "create calendar event", "create task"]
+
+# Sub-intent of each clause in the multi-intent phrasings, in clause order.
+COMPLEX_INTENTS = {
+    "Hey Orianna, can you set up a task to call John next Wednesday at noon, plus put it on my calendar as well?": [
+        "create task", "create calendar event",
+    ],
+    "Do I have any new messages from the weekend, and also could you list out my tasks for this week?": [
+        "check email", "list tasks",
+    ],
+    "Create an event on August 29 at 3pm titled 'Project milestone discussion' and notes 'invite team leads'? Then make a task for me to follow up the next day.": [
+        "create calendar event", "create task",
+    ],
+}
+
+
+def build_cases(prompts: List[str]) -> List[Tuple[str, str]]:
+    cases = []
+    for text in prompts:
+        if text in EXPECTED_INTENTS:
+            intent = next((label for label in EXTRACTING_INTENTS if label in EXPECTED_INTENTS[text]), None)
+            if intent:
+                cases.append((text, intent))
+        elif text in COMPLEX_INTENTS:
+            for clause, intent in zip(segment_clauses(text), COMPLEX_INTENTS[text]):
+                if intent in EXTRACTING_INTENTS:
+                    cases.append((clause, intent))
+    return cases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report how often the rule-based extraction tier avoids the LLM")
+    parser.add_argument("--verbose", action="store_true", help="Print the extracted parameters for every phrasing")
+    args = parser.parse_args()
+
+    registry = get_registry()
+    extraction_stats.reset()
+    rows = []
+    for text, intent in build_cases(load_prompts()):
+        tool = registry.find_tool_for_intent(intent)
+        fast = tool._fast_extract(text, intent)
+        hit = fast is not None and fast.confidence >= FAST_EXTRACTION_MIN_CONFIDENCE
+        extraction_stats.record(tool.get_name(), fast_hit=hit)
+        rows.append({
+            "text": text,
+            "tool": tool.get_name(),
+            "fast_path": hit,
+            "confidence": fast.confidence if fast else None,
+            "params": fast.params if fast and args.verbose else None,
+        })
+
+    stats = extraction_stats.snapshot()
+    total_fast = sum(tool_stats["fast"] for tool_stats in stats.values())
+    total = sum(tool_stats["fast"] + tool_stats["llm"] for tool_stats in stats.values())
+    report = {
+        "hit_rate": round(total_fast / max(1, total), 3),
+        "per_tool": stats,
+        "llm_fallbacks": [row for row in rows if not row["fast_path"]],
+    }
+    if args.verbose:
+        report["cases"] = rows
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
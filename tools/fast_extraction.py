@@ -0,0 +1,159 @@
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from pydantic import BaseModel, Field
+
+FAST_EXTRACTION_ENABLED = os.environ.get("FAST_EXTRACTION_ENABLED", "1") == "1"
+FAST_EXTRACTION_MIN_CONFIDENCE = float(os.environ.get("FAST_EXTRACTION_MIN_CONFIDENCE", "0.8"))
+
+LOCAL_TIMEZONE = ZoneInfo("Europe/Dublin")
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*"
+DAY_PATTERN = re.compile(
+    r"\b(?:today|tonight|tomorrow"
+    r"|(?:next|this)\s+(?:week|" + "|".join(WEEKDAYS) + r")"
+    r"|(?:on\s+)?(?:" + "|".join(WEEKDAYS) + r")"
+    r"|(?:on\s+)?" + _MONTH + r"\s+\d{1,2}(?:st|nd|rd|th)?"
+    r"|(?:on\s+)?(?:the\s+)?\d{1,2}(?:st|nd|rd|th)?\s+(?:of\s+)?" + _MONTH + r")\b",
+    re.IGNORECASE,
+)
+TIME_PATTERN = re.compile(
+    r"\b(?:\d{1,2}(?::\d{2})?\s*(?:am|pm)|\d{1,2}:\d{2}|noon|midday|midnight|morning|afternoon|evening)\b",
+    re.IGNORECASE,
+)
+TIME_RANGE_PATTERN = re.compile(
+    r"\bfrom\s+(?P<start>\d{1,2}(?::\d{2})?\s*(?:am|pm)?)\s+(?:to|until|-)\s+(?P<end>\d{1,2}(?::\d{2})?\s*(?:am|pm))",
+    re.IGNORECASE,
+)
+QUOTED_PATTERN = re.compile(r"'([^']+)'|\"([^\"]+)\"|‘([^’]+)’|“([^”]+)”")
+
+TIME_WORDS = {"noon": "12:00", "midday": "12:00", "midnight": "00:00", "morning": "9:00", "afternoon": "15:00", "evening": "18:00"}
+
+class FastExtraction(BaseModel):
+    params: Dict[str, Any]
+    confidence: float = Field(ge=0.0, le=1.0)
+
+def quoted_strings(text: str) -> List[str]:
+    return [next(group for group in match.groups() if group) for match in QUOTED_PATTERN.finditer(text)]
+
+def quoted_after(text: str, keywords: str) -> Optional[str]:
+    match = re.search(rf"\b(?:{keywords})\b\s*:?\s*(?:{QUOTED_PATTERN.pattern})", text, re.IGNORECASE)
+    if not match:
+        return None
+    return next(group for group in match.groups() if group)
+
+def strip_quoted(text: str) -> str:
+    return QUOTED_PATTERN.sub(" ", text)
+
+def find_day(text: str) -> Optional[str]:
+    match = DAY_PATTERN.search(strip_quoted(text))
+    return re.sub(r"^on\s+", "", match.group(0), flags=re.IGNORECASE) if match else None
+
+def find_time(text: str) -> Optional[str]:
+    match = TIME_PATTERN.search(strip_quoted(text))
+    if not match:
+        return None
+    value = match.group(0)
+    return TIME_WORDS.get(value.lower(), value)
+
+def find_time_range(text: str) -> Optional[Dict[str, str]]:
+    match = TIME_RANGE_PATTERN.search(strip_quoted(text))
+    if not match:
+        return None
+    start, end = match.group("start"), match.group("end")
+    if not re.search(r"am|pm", start, re.IGNORECASE):
+        start += re.search(r"am|pm", end, re.IGNORECASE).group(0)
+    return {"start": start, "end": end}
+
+def find_count(text: str) -> Optional[int]:
+    words = "|".join(NUMBER_WORDS)
+    match = re.search(
+        rf"\b(?:last|top|latest|recent|most recent|first)\s+(\d+|{words})\b|\b(\d+|{words})\s+(?:\w+\s+){{0,2}}(?:e-?mails?|messages?|mails?)\b",
+        text,
+        re.IGNORECASE,
+    )
+    if not match:
+        return None
+    value = (match.group(1) or match.group(2)).lower()
+    return int(value) if value.isdigit() else NUMBER_WORDS[value]
+
+def local_now() -> datetime:
+    return datetime.now(LOCAL_TIMEZONE)
+
+def relative_period(text: str, now: Optional[datetime] = None) -> Optional[Dict[str, str]]:
+    now = now or local_now()
+    today = now.date()
+    lower = text.lower()
+    if "yesterday" in lower:
+        return {"after": str(today - timedelta(days=1)), "before": str(today)}
+    if "today" in lower:
+        return {"after": str(today)}
+    if "weekend" in lower:
+        saturday = today - timedelta(days=(today.weekday() - 5) % 7)
+        return {"after": str(saturday), "before": str(saturday + timedelta(days=2))}
+    if "last week" in lower:
+        monday = today - timedelta(days=today.weekday() + 7)
+        return {"after": str(monday), "before": str(monday + timedelta(days=7))}
+    if "this week" in lower:
+        return {"after": str(today - timedelta(days=today.weekday()))}
+    return None
+
+def resolve_weekday(value: str, now: Optional[datetime] = None) -> str:
+    # dateparser does not understand "next friday"; pin weekday phrases to a date first
+    today = (now or local_now()).date()
+
+    def replace(match: re.Match) -> str:
+        days_ahead = (WEEKDAYS.index(match.group(2).lower()) - today.weekday()) % 7 or 7
+        return str(today + timedelta(days=days_ahead))
+
+    return re.sub(r"\b(?:(next|this|on)\s+)?(" + "|".join(WEEKDAYS) + r")\b", replace, value, flags=re.IGNORECASE)
+
+def to_rfc3339(value: str, now: Optional[datetime] = None) -> Optional[str]:
+    import dateparser
+
+    now = now or local_now()
+    parsed = dateparser.parse(
+        resolve_weekday(value, now),
+        settings={
+            "PREFER_DATES_FROM": "future",
+            "RELATIVE_BASE": now.replace(tzinfo=None),
+            "TIMEZONE": "Europe/Dublin",
+            "RETURN_AS_TIMEZONE_AWARE": True,
+        },
+    )
+    if parsed is None:
+        return None
+    return parsed.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+class ExtractionStats:
+    def __init__(self) -> None:
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, tool: str, fast_hit: bool) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(tool, {"fast": 0, "llm": 0})
+            counts["fast" if fast_hit else "llm"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                tool: {**counts, "hit_rate": counts["fast"] / max(1, counts["fast"] + counts["llm"])}
+                for tool, counts in self._counts.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+extraction_stats = ExtractionStats()
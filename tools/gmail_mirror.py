@@ -0,0 +1,216 @@
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from googleapiclient.errors import HttpError
+from pymongo import ASCENDING, DESCENDING, ReplaceOne
+
+from db.mongo_client import get_database
+
+GMAIL_MIRROR_ENABLED = os.environ.get("GMAIL_MIRROR_ENABLED", "0") == "1"
+GMAIL_MIRROR_SYNC_MODE = os.environ.get("GMAIL_MIRROR_SYNC_MODE", "on_demand")
+GMAIL_MIRROR_SYNC_INTERVAL = float(os.environ.get("GMAIL_MIRROR_SYNC_INTERVAL", "60"))
+GMAIL_MIRROR_MAX_MESSAGES = int(os.environ.get("GMAIL_MIRROR_MAX_MESSAGES", "2000"))
+
+MESSAGES_COLLECTION = "gmail_messages"
+STATE_COLLECTION = "gmail_sync_state"
+HISTORY_TYPES = ["messageAdded", "messageDeleted", "labelAdded", "labelRemoved"]
+
+MessageFetcher = Callable[[Any, List[str], str], List[Dict[str, Any]]]
+
+def _as_utc(value: datetime) -> datetime:
+    # pymongo hands back naive datetimes that are already UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+class GmailMirror:
+    def __init__(self, fetch_messages: MessageFetcher, account: str = "me") -> None:
+        self.fetch_messages = fetch_messages
+        self.account = account
+        self._sync_lock = threading.Lock()
+        self._indexes_ready = False
+        self._background: Optional[threading.Thread] = None
+
+    @property
+    def messages(self):
+        return get_database()[MESSAGES_COLLECTION]
+
+    @property
+    def state(self):
+        return get_database()[STATE_COLLECTION]
+
+    def ensure_indexes(self) -> None:
+        if self._indexes_ready:
+            return
+        self.messages.create_index([("account", ASCENDING), ("label_ids", ASCENDING), ("internal_date", DESCENDING)])
+        self.messages.create_index([("account", ASCENDING), ("from_lower", ASCENDING)])
+        self.messages.create_index([("account", ASCENDING), ("internal_date", DESCENDING)])
+        self._indexes_ready = True
+
+    def is_fresh(self, max_age: float = GMAIL_MIRROR_SYNC_INTERVAL) -> bool:
+        state = self.state.find_one({"_id": self.account})
+        return bool(state and state.get("history_id") and state.get("spam_trash") and time.time() - state.get("synced_at", 0) < max_age)
+
+    def sync(self, service, force: bool = False) -> None:
+        self.ensure_indexes()
+        with self._sync_lock:
+            if not force and self.is_fresh():
+                return
+            state = self.state.find_one({"_id": self.account})
+            # Mirrors built before spam and trash were included need one full resync
+            if state and state.get("history_id") and state.get("spam_trash"):
+                try:
+                    self._incremental_sync(service, state["history_id"])
+                    return
+                except HttpError as e:
+                    if e.resp.status != 404:
+                        raise
+                    logging.info("Gmail history expired, running full mirror resync")
+            self._full_sync(service)
+
+    def start_background_sync(self, get_service: Callable[[], Any]) -> None:
+        if self._background is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.sync(get_service(), force=True)
+                except Exception as e:
+                    logging.warning(f"Gmail mirror sync failed: {e}")
+                time.sleep(GMAIL_MIRROR_SYNC_INTERVAL)
+
+        self._background = threading.Thread(target=loop, name="gmail-mirror-sync", daemon=True)
+        self._background.start()
+
+    def _full_sync(self, service) -> None:
+        history_id = service.users().getProfile(userId="me").execute()["historyId"]
+        message_ids: List[str] = []
+        page_token = None
+        while len(message_ids) < GMAIL_MIRROR_MAX_MESSAGES:
+            # Spam and trash too, or queries on those labels would find an empty mirror
+            params = {
+                "userId": "me",
+                "includeSpamTrash": True,
+                "maxResults": min(500, GMAIL_MIRROR_MAX_MESSAGES - len(message_ids)),
+            }
+            if page_token:
+                params["pageToken"] = page_token
+            result = service.users().messages().list(**params).execute()
+            message_ids.extend(msg["id"] for msg in result.get("messages", []) or [])
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                break
+
+        # Upsert first and prune after, so queries never see an empty mirror
+        messages = self.fetch_messages(service, message_ids, "metadata")
+        self._store(messages)
+        self.messages.delete_many({"account": self.account, "_id": {"$nin": [msg["id"] for msg in messages]}})
+        # Capped at GMAIL_MIRROR_MAX_MESSAGES: anything older than the oldest kept message is missing
+        covered_since = None
+        if page_token and messages:
+            covered_since = min(self._to_document(msg)["internal_date"] for msg in messages)
+        self._save_state(history_id, covered_since=covered_since, spam_trash=True)
+
+    def _incremental_sync(self, service, start_history_id: str) -> None:
+        changed: Dict[str, None] = {}
+        deleted = set()
+        latest_history_id = start_history_id
+        page_token = None
+        while True:
+            params = {"userId": "me", "startHistoryId": start_history_id, "historyTypes": HISTORY_TYPES}
+            if page_token:
+                params["pageToken"] = page_token
+            result = service.users().history().list(**params).execute()
+            for record in result.get("history", []):
+                for entry in record.get("messagesAdded", []) + record.get("labelsAdded", []) + record.get("labelsRemoved", []):
+                    changed[entry["message"]["id"]] = None
+                for entry in record.get("messagesDeleted", []):
+                    deleted.add(entry["message"]["id"])
+            latest_history_id = result.get("historyId", latest_history_id)
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                break
+
+        if deleted:
+            self.messages.delete_many({"account": self.account, "_id": {"$in": list(deleted)}})
+        refresh_ids = [message_id for message_id in changed if message_id not in deleted]
+        if refresh_ids:
+            self._store(self.fetch_messages(service, refresh_ids, "metadata"))
+        self._save_state(latest_history_id)
+
+    def _store(self, messages: List[Dict[str, Any]]) -> None:
+        operations = [ReplaceOne({"_id": msg["id"]}, self._to_document(msg), upsert=True) for msg in messages]
+        if operations:
+            self.messages.bulk_write(operations, ordered=False)
+
+    def _save_state(self, history_id: str, **full_sync: Any) -> None:
+        self.state.update_one(
+            {"_id": self.account},
+            {"$set": {"history_id": history_id, "synced_at": time.time(), **full_sync}},
+            upsert=True,
+        )
+
+    def covered_since(self) -> Optional[datetime]:
+        state = self.state.find_one({"_id": self.account}) or {}
+        if "covered_since" in state:
+            return _as_utc(state["covered_since"]) if state["covered_since"] else None
+        # Mirrors synced before this was recorded: assume only what is stored
+        oldest = next(iter(self.messages.find({"account": self.account}).sort("internal_date", ASCENDING).limit(1)), None)
+        return _as_utc(oldest["internal_date"]) if oldest else None
+
+    def _to_document(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        headers = {h["name"].lower(): h["value"] for h in msg.get("payload", {}).get("headers", [])}
+        sender = headers.get("from", "")
+        subject = headers.get("subject", "")
+        return {
+            "_id": msg["id"],
+            "account": self.account,
+            "thread_id": msg.get("threadId"),
+            "label_ids": msg.get("labelIds", []),
+            "from": sender,
+            "from_lower": sender.lower(),
+            "subject": subject,
+            "subject_lower": subject.lower(),
+            "snippet": msg.get("snippet", ""),
+            "internal_date": datetime.fromtimestamp(int(msg.get("internalDate", 0)) / 1000, tz=timezone.utc),
+        }
+
+    def query(
+        self,
+        label_id: str,
+        max_results: int,
+        sender_filter: Optional[str] = None,
+        unread_only: bool = False,
+        after: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        subject_keywords: Optional[List[str]] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        labels = [label_id] + (["UNREAD"] if unread_only else [])
+        criteria: Dict[str, Any] = {"account": self.account, "label_ids": {"$all": labels}}
+        if sender_filter:
+            criteria["from_lower"] = {"$regex": re.escape(sender_filter.lower())}
+        if after or before:
+            criteria["internal_date"] = {}
+            if after:
+                criteria["internal_date"]["$gte"] = after
+            if before:
+                criteria["internal_date"]["$lt"] = before
+        keywords = [keyword.strip().lower() for keyword in subject_keywords or [] if keyword.strip()]
+        if keywords:
+            criteria["$and"] = [{"subject_lower": {"$regex": re.escape(keyword)}} for keyword in keywords]
+
+        docs = list(self.messages.find(criteria).sort("internal_date", DESCENDING).limit(max_results))
+        if len(docs) < max_results:
+            # Too few matches: more may be older than the mirror reaches, so the
+            # caller has to ask the API (None) unless the range starts inside it
+            covered_since = self.covered_since()
+            if covered_since and (after is None or _as_utc(after) < covered_since):
+                return None
+        return [
+            {"id": doc["_id"], "subject": doc["subject"], "from": doc["from"], "snippet": doc["snippet"]}
+            for doc in docs
+        ]
@@ -1,42 +1,48 @@
+import base64
+import logging
 import os
-import pickle
 import re
-import json
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from dotenv import load_dotenv
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from pydantic import BaseModel, Field
 
 from tools.base_tool import BaseTool
+from tools.fast_extraction import FastExtraction, find_count, quoted_after, quoted_strings, relative_period
+from tools.gmail_mirror import GMAIL_MIRROR_ENABLED, GMAIL_MIRROR_SYNC_MODE, GmailMirror
+from tools.google_auth import PICKLES_DIR, get_google_service
 
-load_dotenv()
-
-BASE_DIR = os.path.dirname(__file__)
-PICKLES_DIR = os.path.join(BASE_DIR, "pickles")
-CONFIG_DIR = os.path.join(BASE_DIR, "config")
 GMAIL_TOKEN_FILE = "google_gmail_token.pickle"
-GMAIL_CREDS_FILE = "google_credentials.json"
 TOKEN_PATH = os.path.join(PICKLES_DIR, GMAIL_TOKEN_FILE)
-CREDS_PATH = os.path.join(CONFIG_DIR, GMAIL_CREDS_FILE)
+GMAIL_BATCH_SIZE = int(os.environ.get("GMAIL_BATCH_SIZE", "50"))
+METADATA_HEADERS = ["Subject", "From", "Date"]
+
+GMAIL_LIST_PAGE_SIZE = 500
 
-credentials_json = os.getenv("GOOGLE_CREDENTIALS_JSON")
-google_credentials = None
-if credentials_json:
-    try:
-        google_credentials = json.loads(credentials_json)
-    except json.JSONDecodeError as e:
-        raise ValueError("Invalid JSON in GOOGLE_CREDENTIALS_JSON") from e
+# Date phrasings the fast path does not resolve itself; these go to the LLM
+AMBIGUOUS_PERIOD = re.compile(
+    r"\b(?:since|between|before|after|ago|month|year|last night|(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d)",
+    re.IGNORECASE,
+)
 
 class CheckGmailInboxInput(BaseModel):
     label_id: str = Field(default="INBOX")
     max_results: int = Field(default=5)
     sender_filter: Optional[str] = Field(default=None)
+    unread_only: bool = Field(default=False)
+    after: Optional[str] = Field(default=None, description="Only emails received on or after this date")
+    before: Optional[str] = Field(default=None, description="Only emails received before this date")
+    subject_keywords: List[str] = Field(default_factory=list)
 
 class GmailTool(BaseTool):
     SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
+    extraction_model = CheckGmailInboxInput
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.mirror = GmailMirror(self._get_messages) if GMAIL_MIRROR_ENABLED else None
+        if self.mirror and GMAIL_MIRROR_SYNC_MODE == "interval":
+            self.mirror.start_background_sync(self._get_gmail_service)
 
     def get_name(self) -> str:
         return "gmail_tool"
@@ -48,11 +54,16 @@ class GmailTool(BaseTool):
         return (
             "You are a parameter-extraction assistant for checking Gmail.\n"
             "Output ONLY JSON with fields:\n"
-            '{ "label_id": "<string (INBOX, SPAM, etc.)>", "max_results": <integer>, "sender_filter": "<optional string>" }\n'
+            '{ "label_id": "<string (INBOX, SPAM, etc.)>", "max_results": <integer>, "sender_filter": "<optional string>",'
+            ' "unread_only": <boolean>, "after": "<optional YYYY-MM-DD>", "before": "<optional YYYY-MM-DD>",'
+            ' "subject_keywords": [<strings>] }\n'
             "No extra text.\n"
             "If user doesn't mention max, default to 5.\n"
             "If user doesn't mention label, default to 'INBOX'.\n"
-            "If user mentions a sender, set sender_filter."
+            "If user mentions a sender, set sender_filter.\n"
+            "If user asks for unread or new emails, set unread_only to true.\n"
+            "If user mentions a time period, set after/before; otherwise leave them empty.\n"
+            "If user mentions words the subject should contain, list them in subject_keywords."
         )
 
     def parse_and_execute(self, user_text: str, **kwargs) -> Dict[str, Any]:
@@ -63,10 +74,52 @@ class GmailTool(BaseTool):
                 "action": "unknown_intent",
                 "message": f"GmailTool cannot handle intent '{intent}'",
             }
-        return self._check_inbox_flow(user_text)
+        return self._check_inbox_flow(user_text, include_body=intent == "read emails")
+
+    def _fast_extract(self, user_text: str, intent: str = "") -> Optional[FastExtraction]:
+        lower = user_text.lower()
+        label_map = self._get_label_map()
+        params: Dict[str, Any] = {}
+
+        label_words = re.findall(r"\b(" + "|".join(label_map) + r"|draft)\b", lower)
+        labels = {label_map.get(word, "DRAFT") for word in label_words}
+        if len(labels) > 1:
+            return None
+        if labels:
+            params["label_id"] = labels.pop()
+
+        count = find_count(user_text)
+        if count is not None:
+            params["max_results"] = count
+
+        sender = quoted_after(user_text, "from")
+        if sender is None:
+            match = re.search(r"\bfrom\s+([\w.+-]+@[\w.-]+|[A-Z][\w&.-]*(?:\s+[A-Z][\w&.-]*)*)", user_text)
+            if match and match.group(1).lower() not in label_map:
+                sender = match.group(1)
+        if sender:
+            params["sender_filter"] = sender
+
+        if re.search(r"\b(?:unread|new)\b", lower):
+            params["unread_only"] = True
+
+        period = relative_period(user_text)
+        if period:
+            params.update(period)
+        elif AMBIGUOUS_PERIOD.search(user_text):
+            return FastExtraction(params=params, confidence=0.3)
+
+        keyword = quoted_after(user_text, "about|subject|titled|containing")
+        if keyword:
+            params["subject_keywords"] = [keyword]
+
+        quoted = quoted_strings(user_text)
+        # A quoted phrase we could not place (sender or subject) is worth a real parse
+        unplaced = [text for text in quoted if text not in (sender, keyword)]
+        return FastExtraction(params=params, confidence=0.5 if unplaced else 0.9)
 
-    def _check_inbox_flow(self, user_text: str) -> Dict[str, Any]:
-        tool_args = self._extract_params_via_llm(user_text)
+    def _check_inbox_flow(self, user_text: str, include_body: bool = False) -> Dict[str, Any]:
+        tool_args = self._extract_params(user_text)
         if "error" in tool_args:
             return {
                 "tool": self.get_name(),
@@ -82,16 +135,19 @@ class GmailTool(BaseTool):
                 "message": f"Invalid parameters: {str(e)}",
             }
 
-        emails = self._fetch_emails(
-            label_id=inbox_input.label_id,
-            max_results=inbox_input.max_results,
-            sender_filter=inbox_input.sender_filter,
-        )
+        emails = self._fetch_emails(inbox_input, include_body=include_body)
 
-        summary = "Emails: " + ", ".join(
-            f"{self._extract_email(email['from'])} with subject '{self._normalize_text(email['subject'])}'"
-            for email in emails
-        )
+        if include_body:
+            summary = "Emails: " + ", ".join(
+                f"{self._extract_email(email['from'])} with subject '{self._normalize_text(email['subject'])}' "
+                f"saying '{self._normalize_text(email['body'])[:200]}'"
+                for email in emails
+            )
+        else:
+            summary = "Emails: " + ", ".join(
+                f"{self._extract_email(email['from'])} with subject '{self._normalize_text(email['subject'])}'"
+                for email in emails
+            )
 
         return {
             "tool": self.get_name(),
@@ -102,64 +158,148 @@ class GmailTool(BaseTool):
         }
 
     def _fetch_emails(
-        self, label_id="INBOX", max_results=5, sender_filter=None
+        self, inbox_input: CheckGmailInboxInput, include_body=False
     ) -> List[Dict[str, Any]]:
         label_map = self._get_label_map()
-        mapped_label_id = label_map.get(label_id.lower(), label_id)
+        mapped_label_id = label_map.get(inbox_input.label_id.lower(), inbox_input.label_id)
 
         service = self._get_gmail_service()
-        result = (
-            service.users()
-            .messages()
-            .list(userId="me", labelIds=[mapped_label_id], maxResults=max_results)
-            .execute()
-        )
+        emails = None
+        if self.mirror:
+            try:
+                emails = self._fetch_emails_from_mirror(service, mapped_label_id, inbox_input)
+            except Exception as e:
+                logging.warning(f"Gmail mirror unavailable, querying the API instead: {e}")
+        if emails is None:
+            emails = self._fetch_emails_from_api(service, mapped_label_id, inbox_input)
+
+        if include_body and emails:
+            bodies = {
+                msg_data["id"]: self._get_body_text(msg_data.get("payload", {}))
+                for msg_data in self._get_messages(service, [email["id"] for email in emails], "full")
+            }
+            for email in emails:
+                email["body"] = bodies.get(email["id"]) or email["snippet"]
+        return emails
+
+    def _fetch_emails_from_api(
+        self, service, mapped_label_id: str, inbox_input: CheckGmailInboxInput
+    ) -> List[Dict[str, Any]]:
+        query = self._build_query(inbox_input)
+        message_ids: List[str] = []
+        page_token = None
+        while len(message_ids) < inbox_input.max_results:
+            params = {
+                "userId": "me",
+                "labelIds": [mapped_label_id],
+                "maxResults": min(inbox_input.max_results - len(message_ids), GMAIL_LIST_PAGE_SIZE),
+            }
+            if query:
+                params["q"] = query
+            if page_token:
+                params["pageToken"] = page_token
+            result = service.users().messages().list(**params).execute()
+            message_ids.extend(msg["id"] for msg in result.get("messages", []) or [])
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                break
 
-        messages = result.get("messages", [])
         emails = []
-        for msg in messages or []:
-            msg_data = (
-                service.users().messages().get(userId="me", id=msg["id"]).execute()
-            )
+        for msg_data in self._get_messages(service, message_ids[:inbox_input.max_results], "metadata"):
             headers = msg_data.get("payload", {}).get("headers", [])
             subject = self._get_header_value(headers, "Subject")
             sender = self._get_header_value(headers, "From")
             snippet = msg_data.get("snippet", "")
+            emails.append({"id": msg_data["id"], "subject": subject, "from": sender, "snippet": snippet})
+        return emails
 
-            if sender_filter and sender_filter.lower() not in sender.lower():
-                continue
+    def _fetch_emails_from_mirror(
+        self, service, mapped_label_id: str, inbox_input: CheckGmailInboxInput
+    ) -> Optional[List[Dict[str, Any]]]:
+        self.mirror.sync(service)
+        return self.mirror.query(
+            label_id=mapped_label_id,
+            max_results=inbox_input.max_results,
+            sender_filter=inbox_input.sender_filter,
+            unread_only=inbox_input.unread_only,
+            after=self._parse_filter_date(inbox_input.after) if inbox_input.after else None,
+            before=self._parse_filter_date(inbox_input.before) if inbox_input.before else None,
+            subject_keywords=inbox_input.subject_keywords,
+        )
 
-            emails.append({"subject": subject, "from": sender, "snippet": snippet})
-        return emails
+    def _get_messages(self, service, message_ids: List[str], message_format: str) -> List[Dict[str, Any]]:
+        responses: Dict[str, Dict[str, Any]] = {}
+
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                logging.warning(f"Gmail fetch failed for message {request_id}: {exception}")
+                return
+            responses[request_id] = response
+
+        for start in range(0, len(message_ids), GMAIL_BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=on_response)
+            for message_id in message_ids[start:start + GMAIL_BATCH_SIZE]:
+                params = {"userId": "me", "id": message_id, "format": message_format}
+                if message_format == "metadata":
+                    params["metadataHeaders"] = METADATA_HEADERS
+                batch.add(service.users().messages().get(**params), request_id=message_id)
+            batch.execute()
+        return [responses[message_id] for message_id in message_ids if message_id in responses]
+
+    def _build_query(self, inbox_input: CheckGmailInboxInput) -> str:
+        terms = []
+        if inbox_input.sender_filter:
+            terms.append(f"from:{self._quote_term(inbox_input.sender_filter)}")
+        if inbox_input.unread_only:
+            terms.append("is:unread")
+        if inbox_input.after:
+            after = self._to_query_date(inbox_input.after)
+            if after:
+                terms.append(f"after:{after}")
+        if inbox_input.before:
+            before = self._to_query_date(inbox_input.before)
+            if before:
+                terms.append(f"before:{before}")
+        for keyword in inbox_input.subject_keywords:
+            if keyword.strip():
+                terms.append(f"subject:{self._quote_term(keyword)}")
+        return " ".join(terms)
+
+    @staticmethod
+    def _quote_term(term: str) -> str:
+        term = term.strip().replace('"', "")
+        return f'"{term}"' if re.search(r"[\s(){}:]", term) else term
+
+    @staticmethod
+    def _parse_filter_date(value: str) -> Optional[datetime]:
+        import dateparser
+
+        return dateparser.parse(
+            value,
+            settings={
+                "PREFER_DATES_FROM": "past",
+                "TIMEZONE": "Europe/Dublin",
+                "RETURN_AS_TIMEZONE_AWARE": True,
+            },
+        )
+
+    def _to_query_date(self, value: str) -> Optional[str]:
+        parsed = self._parse_filter_date(value)
+        return parsed.strftime("%Y/%m/%d") if parsed else None
+
+    @staticmethod
+    def _get_body_text(payload: Dict[str, Any]) -> str:
+        parts = [payload]
+        while parts:
+            part = parts.pop(0)
+            data = part.get("body", {}).get("data")
+            if part.get("mimeType") == "text/plain" and data:
+                return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4)).decode("utf-8", errors="replace")
+            parts.extend(part.get("parts", []))
+        return ""
 
     def _get_gmail_service(self):
-        creds = self._load_credentials()
-        if not creds or not creds.valid:
-            creds = self._refresh_or_authorize_credentials(creds)
-            self._save_credentials(creds)
-        return build("gmail", "v1", credentials=creds)
-
-    def _load_credentials(self):
-        if os.path.exists(TOKEN_PATH):
-            with open(TOKEN_PATH, "rb") as token:
-                return pickle.load(token)
-        return None
-
-    def _refresh_or_authorize_credentials(self, creds):
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            if google_credentials:
-                flow = InstalledAppFlow.from_client_config(google_credentials, self.SCOPES)
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(CREDS_PATH, self.SCOPES)
-            creds = flow.run_local_server(port=0)
-        return creds
-
-    def _save_credentials(self, creds):
-        os.makedirs(PICKLES_DIR, exist_ok=True)
-        with open(TOKEN_PATH, "wb") as token:
-            pickle.dump(creds, token)
+        return get_google_service("gmail", "v1", TOKEN_PATH, self.SCOPES)
 
     @staticmethod
     def _get_label_map() -> Dict[str, str]:
@@ -0,0 +1,140 @@
+import json
+import os
+import pickle
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from google.auth.credentials import AnonymousCredentials
+from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.http import build_http
+
+from ai.timings import timed
+
+load_dotenv()
+
+BASE_DIR = os.path.dirname(__file__)
+PICKLES_DIR = os.path.join(BASE_DIR, "pickles")
+CONFIG_DIR = os.path.join(BASE_DIR, "config")
+CREDS_PATH = os.path.join(CONFIG_DIR, "google_credentials.json")
+GOOGLE_TOKEN_REFRESH_MARGIN = int(os.environ.get("GOOGLE_TOKEN_REFRESH_MARGIN", "300"))
+# Points every Google API at a local emulator, which takes anonymous requests
+GOOGLE_API_ENDPOINT = os.environ.get("GOOGLE_API_ENDPOINT")
+
+credentials_json = os.getenv("GOOGLE_CREDENTIALS_JSON")
+google_credentials = None
+if credentials_json:
+    try:
+        google_credentials = json.loads(credentials_json)
+    except json.JSONDecodeError as e:
+        raise ValueError("Invalid JSON in GOOGLE_CREDENTIALS_JSON") from e
+
+class GoogleCredentialManager:
+    def __init__(self, refresh_margin: int = GOOGLE_TOKEN_REFRESH_MARGIN) -> None:
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self._creds: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, token_path: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(token_path, threading.Lock())
+
+    def _needs_refresh(self, creds) -> bool:
+        if not creds.valid:
+            return True
+        if creds.expiry is None:
+            return False
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return creds.expiry - self.refresh_margin <= now
+
+    def get_credentials(self, token_path: str, scopes: List[str]):
+        creds = self._creds.get(token_path)
+        if creds is not None and not self._needs_refresh(creds):
+            return creds
+        with self._lock_for(token_path):
+            creds = self._creds.get(token_path)
+            if creds is None:
+                creds = self._load_credentials(token_path)
+            if creds is None or self._needs_refresh(creds):
+                creds = self._refresh_or_authorize_credentials(creds, scopes)
+                self._save_credentials(token_path, creds)
+            self._creds[token_path] = creds
+            return creds
+
+    def _load_credentials(self, token_path: str):
+        if os.path.exists(token_path):
+            with open(token_path, "rb") as token:
+                return pickle.load(token)
+        return None
+
+    def _refresh_or_authorize_credentials(self, creds, scopes: List[str]):
+        if creds and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            if google_credentials:
+                flow = InstalledAppFlow.from_client_config(google_credentials, scopes)
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(CREDS_PATH, scopes)
+            creds = flow.run_local_server(port=0)
+        return creds
+
+    def _save_credentials(self, token_path: str, creds) -> None:
+        token_dir = os.path.dirname(token_path)
+        os.makedirs(token_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=token_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as token:
+                pickle.dump(creds, token)
+                token.flush()
+                os.fsync(token.fileno())
+            os.replace(tmp_path, token_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+credential_manager = GoogleCredentialManager()
+
+class _TimedHttp(AuthorizedHttp):
+    def request(self, *args, **kwargs):
+        with timed("google"):
+            return super().request(*args, **kwargs)
+
+_anonymous_credentials = AnonymousCredentials()
+
+def _discovery_document(api_name: str, api_version: str) -> Dict[str, Any]:
+    document = json.loads(discovery_cache.get_static_doc(api_name, api_version))
+    if GOOGLE_API_ENDPOINT:
+        # Overriding rootUrl rather than api_endpoint also moves the batch endpoint
+        document["rootUrl"] = document["mtlsRootUrl"] = GOOGLE_API_ENDPOINT.rstrip("/") + "/"
+    return document
+
+# googleapiclient service objects share an httplib2 connection that is not
+# thread-safe, so built services are cached per thread.
+_services = threading.local()
+
+def get_google_service(api_name: str, api_version: str, token_path: str, scopes: List[str]):
+    if GOOGLE_API_ENDPOINT:
+        creds = _anonymous_credentials
+    else:
+        creds = credential_manager.get_credentials(token_path, scopes)
+    cache: Dict[Tuple[str, str, str], Tuple[Any, Any]] = getattr(_services, "cache", None)
+    if cache is None:
+        cache = _services.cache = {}
+    key = (api_name, api_version, token_path)
+    cached: Optional[Tuple[Any, Any]] = cache.get(key)
+    if cached is not None and cached[0] is creds:
+        return cached[1]
+    service = build_from_document(
+        _discovery_document(api_name, api_version),
+        http=_TimedHttp(creds, http=build_http()),
+    )
+    cache[key] = (creds, service)
+    return service
@@ -1,34 +1,34 @@
+import heapq
 import os
-import pickle
-import json
+import re
+from itertools import islice
 from datetime import datetime, timedelta, timezone, time
 from zoneinfo import ZoneInfo
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pytz
-from dotenv import load_dotenv  # Added to load .env file
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from pydantic import BaseModel, Field
 
 from tools.base_tool import BaseTool
-
-load_dotenv()
+from tools.fast_extraction import (
+    FastExtraction,
+    find_day,
+    find_time,
+    find_time_range,
+    quoted_after,
+    quoted_strings,
+    resolve_weekday,
+    to_rfc3339,
+)
+from tools.calendar_store import CALENDAR_STORE_ENABLED, CalendarStore, event_bounds
+from tools.google_auth import PICKLES_DIR, get_google_service
+from tools.google_fanout import fan_out, list_all_pages
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
 API_NAME = "calendar"
 API_VERSION = "v3"
 TOKEN_FILE = "google_calendar_token.pickle"
-CREDS_FILE_NAME = "google_credentials.json"
-
-credentials_json = os.getenv("GOOGLE_CREDENTIALS_JSON")
-google_credentials = None
-if credentials_json:
-    try:
-        google_credentials = json.loads(credentials_json)
-    except json.JSONDecodeError as e:
-        raise ValueError("Invalid JSON in GOOGLE_CREDENTIALS_JSON") from e
+GOOGLE_CALENDAR_IDS = [cid.strip() for cid in os.getenv("GOOGLE_CALENDAR_IDS", "").split(",") if cid.strip()]
 
 class CreateCalendarEventInput(BaseModel):
     summary: str
@@ -42,12 +42,12 @@ class GetCalendarEventInput(BaseModel):
     max_results: Optional[int] = Field(5, description="Maximum number of events to retrieve.")
 
 class GoogleCalendarTool(BaseTool):
+    extraction_model = CreateCalendarEventInput
+
     def __init__(self) -> None:
         super().__init__()
-        base_dir = os.path.dirname(__file__)
-        self.token_path = os.path.join(base_dir, "pickles", TOKEN_FILE)
-        self.creds_path = os.path.join(base_dir, "config", CREDS_FILE_NAME)
-        os.makedirs(os.path.dirname(self.token_path), exist_ok=True)
+        self.token_path = os.path.join(PICKLES_DIR, TOKEN_FILE)
+        self.store = CalendarStore() if CALENDAR_STORE_ENABLED else None
 
     def get_name(self) -> str:
         return "calendar_tool"
@@ -99,8 +99,49 @@ class GoogleCalendarTool(BaseTool):
         else:
             return "next 7 days"
 
+    def _fast_extract(self, user_text: str, intent: str = "") -> Optional[FastExtraction]:
+        description = quoted_after(user_text, "description|notes?")
+        if description is None:
+            match = re.search(r"'([^']+)'\s+in the (?:description|notes)", user_text, re.IGNORECASE)
+            description = match.group(1) if match else None
+        location = quoted_after(user_text, "location|at location|in room")
+        summary = quoted_after(user_text, "called|titled|named|summary|with summary")
+        if summary is None:
+            remaining = [text for text in quoted_strings(user_text) if text not in (description, location)]
+            if len(remaining) == 1:
+                summary = remaining[0]
+            else:
+                match = re.search(r"\b(?:about|for) my ([\w\s]+?(?:appointment|meeting|call|session|class))\b", user_text, re.IGNORECASE)
+                summary = match.group(1) if match else None
+        if not summary:
+            return None
+
+        params: Dict[str, Any] = {"summary": summary}
+        if description:
+            params["description"] = description
+        if location:
+            params["location"] = location
+
+        day = find_day(user_text)
+        time_range = find_time_range(user_text)
+        start = time_range["start"] if time_range else find_time(user_text)
+        if not day and not start:
+            return FastExtraction(params=params, confidence=0.2)
+        # Resolve the phrase here: a start_time the insert cannot parse must go to the LLM instead
+        start_time = to_rfc3339(" ".join(part for part in (day, start) if part))
+        if start_time is None:
+            return FastExtraction(params=params, confidence=0.3)
+        params["start_time"] = start_time
+        if time_range:
+            end_time = to_rfc3339(" ".join(part for part in (day, time_range["end"]) if part))
+            if end_time is None:
+                return FastExtraction(params=params, confidence=0.3)
+            params["end_time"] = end_time
+        # Without a time of day the LLM is better at reading intent ("after lunch", "first thing")
+        return FastExtraction(params=params, confidence=0.9 if start else 0.5)
+
     def _create_event_flow(self, user_text: str) -> Dict[str, Any]:
-        tool_args = self._extract_params_via_llm(user_text)
+        tool_args = self._extract_params(user_text)
         if "error" in tool_args:
             return {
                 "tool": self.get_name(),
@@ -115,13 +156,24 @@ class GoogleCalendarTool(BaseTool):
                 "action": "create_event",
                 "message": f"Invalid parameters: {str(e)}",
             }
-        new_event = self._insert_event(event_input)
+        try:
+            new_event, conflicts = self._insert_event(event_input)
+        except ValueError as e:
+            return {
+                "tool": self.get_name(),
+                "action": "create_event",
+                "message": f"Invalid parameters: {str(e)}",
+            }
+        message = f"Event '{event_input.summary}' created."
+        if conflicts:
+            message += " It overlaps with " + ", ".join(f"'{event.get('summary', 'No summary')}'" for event in conflicts) + "."
         return {
             "tool": self.get_name(),
             "action": "create_event",
             "result": new_event,
-            "message": f"Event '{event_input.summary}' created.",
-            "summary": f"Event '{event_input.summary}' created.",
+            "conflicts": conflicts,
+            "message": message,
+            "summary": message,
         }
 
     def _fetch_events_by_context(self, input_params: GetCalendarEventInput) -> List[Dict[str, Any]]:
@@ -150,24 +202,42 @@ class GoogleCalendarTool(BaseTool):
 
         start_utc = start_local.astimezone(timezone.utc)
         end_utc = end_local.astimezone(timezone.utc)
+        calendar_ids = self._get_selected_calendar_ids(service)
+        if self.store:
+            fan_out(lambda calendar_id: self.store.sync(self._get_calendar_service(), calendar_id), calendar_ids)
+            if self.store.covers(start_utc, end_utc, calendar_ids):
+                return self.store.events_between(start_utc, end_utc, calendar_ids, limit=input_params.max_results)
+
         time_min = self._to_utc_rfc3339(start_utc)
         time_max = self._to_utc_rfc3339(end_utc)
 
-        events_result = (
-            service.events()
-            .list(
-                calendarId="primary",
-                singleEvents=True,
-                orderBy="startTime",
-                timeMin=time_min,
-                timeMax=time_max,
-                maxResults=input_params.max_results,
+        def list_calendar(calendar_id: str) -> List[Dict[str, Any]]:
+            return list_all_pages(
+                self._get_calendar_service().events().list,
+                {
+                    "calendarId": calendar_id,
+                    "singleEvents": True,
+                    "orderBy": "startTime",
+                    "timeMin": time_min,
+                    "timeMax": time_max,
+                    "maxResults": min(input_params.max_results or 2500, 2500),
+                },
+                limit=input_params.max_results,
             )
-            .execute()
-        )
-        return events_result.get("items", [])
 
-    def _insert_event(self, event_input: CreateCalendarEventInput) -> Dict[str, Any]:
+        # Each calendar comes back ordered by start time, so only the first
+        # max_results of each can make the merged cut.
+        merged = heapq.merge(*fan_out(list_calendar, calendar_ids), key=lambda event: event_bounds(event)[0])
+        return list(islice(merged, input_params.max_results))
+
+    def _get_selected_calendar_ids(self, service) -> List[str]:
+        if GOOGLE_CALENDAR_IDS:
+            return GOOGLE_CALENDAR_IDS
+        calendars = list_all_pages(service.calendarList().list, {"minAccessRole": "reader"})
+        selected = [calendar["id"] for calendar in calendars if calendar.get("selected") or calendar.get("primary")]
+        return selected or ["primary"]
+
+    def _insert_event(self, event_input: CreateCalendarEventInput) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         service = self._get_calendar_service()
         dublin_tz = pytz.timezone("Europe/Dublin")
         now_in_dublin = datetime.now(dublin_tz)
@@ -186,21 +256,31 @@ class GoogleCalendarTool(BaseTool):
         if event_input.description:
             event_body["description"] = event_input.description
 
-        return service.events().insert(calendarId="primary", body=event_body).execute()
+        conflicts = []
+        if self.store:
+            self.store.sync(service, "primary")
+            if self.store.covers(start_dt_utc, end_dt_utc, ["primary"]):
+                conflicts = self.store.find_conflicts(start_dt_utc, end_dt_utc, ["primary"])
+
+        new_event = service.events().insert(calendarId="primary", body=event_body).execute()
+        if self.store:
+            self.store.upsert_event("primary", new_event)
+        return new_event, conflicts
 
     def _parse_date(self, date_str: str, relative_base: datetime) -> datetime:
         import dateparser
         parsed_dt = dateparser.parse(
-            date_str,
+            resolve_weekday(date_str),
             settings={
                 "PREFER_DATES_FROM": "future",
                 "RELATIVE_BASE": relative_base,
                 "TIMEZONE": "Europe/Dublin",
                 "TO_TIMEZONE": "Europe/Dublin",
+                "RETURN_AS_TIMEZONE_AWARE": True,
             }
         )
         if not parsed_dt:
-            parsed_dt = relative_base
+            raise ValueError(f"Could not understand the date '{date_str}'")
         if parsed_dt < relative_base:
             parsed_dt += timedelta(days=7)
         return parsed_dt
@@ -219,8 +299,11 @@ class GoogleCalendarTool(BaseTool):
         return summary_str
 
     def _convert_to_readable(self, start_info: dict) -> str:
-        if start_info:
-            iso_str = start_info.get("dateTime")
+        if start_info.get("date") and not start_info.get("dateTime"):
+            # All-day events carry a bare date and no time zone
+            return datetime.strptime(start_info["date"], "%Y-%m-%d").strftime("%A, %B %d, %Y (all day)")
+        if start_info.get("dateTime"):
+            iso_str = start_info["dateTime"]
             tz_name = start_info.get("timeZone", "UTC")
             dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
             dt = dt.astimezone(ZoneInfo(tz_name))
@@ -228,32 +311,7 @@ class GoogleCalendarTool(BaseTool):
         return ""
 
     def _get_calendar_service(self):
-        creds = self._load_credentials()
-        if not creds or not creds.valid:
-            creds = self._refresh_or_authorize_credentials(creds)
-            self._save_credentials(creds)
-        return build(API_NAME, API_VERSION, credentials=creds)
-
-    def _load_credentials(self):
-        if os.path.exists(self.token_path):
-            with open(self.token_path, "rb") as token:
-                return pickle.load(token)
-        return None
-
-    def _refresh_or_authorize_credentials(self, creds):
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            if google_credentials:
-                flow = InstalledAppFlow.from_client_config(google_credentials, SCOPES)
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(self.creds_path, SCOPES)
-            creds = flow.run_local_server(port=0)
-        return creds
-
-    def _save_credentials(self, creds):
-        with open(self.token_path, "wb") as token:
-            pickle.dump(creds, token)
+        return get_google_service(API_NAME, API_VERSION, self.token_path, SCOPES)
 
     def _to_utc_rfc3339(self, dt: datetime) -> str:
         dt_utc = dt.astimezone(timezone.utc).replace(microsecond=0)
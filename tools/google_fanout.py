@@ -0,0 +1,40 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+GOOGLE_FANOUT_WORKERS = int(os.environ.get("GOOGLE_FANOUT_WORKERS", "8"))
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Separate from the request I/O pool so a tool running there can fan out
+# without waiting on its own pool.
+_executor = ThreadPoolExecutor(max_workers=GOOGLE_FANOUT_WORKERS, thread_name_prefix="google-fanout")
+
+def fan_out(fn: Callable[[T], R], items: Iterable[T]) -> List[R]:
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    # One context copy per item: a context cannot be entered by two threads at once
+    futures = [_executor.submit(contextvars.copy_context().run, fn, item) for item in items]
+    return [future.result() for future in futures]
+
+def list_all_pages(
+    list_method: Callable[..., Any],
+    params: Dict[str, Any],
+    items_key: str = "items",
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    items: List[Dict[str, Any]] = []
+    page_token = None
+    while limit is None or len(items) < limit:
+        page_params = dict(params)
+        if page_token:
+            page_params["pageToken"] = page_token
+        result = list_method(**page_params).execute()
+        items.extend(result.get(items_key, []))
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            break
+    return items if limit is None else items[:limit]
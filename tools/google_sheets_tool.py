@@ -1,31 +1,41 @@
 import os
-import pickle
-import json
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 import pandas as pd
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from dotenv import load_dotenv
 
-load_dotenv()
+from db.sheet_sync import get_sheet_sync_state, get_synced_row_hashes, record_synced_rows, set_sheet_sync_state
+from db.transaction_ledger import transaction_hash
+from tools.google_auth import PICKLES_DIR, get_google_service
+from tools.statement_io import iter_statement_chunks
 
-credentials_json = os.getenv("GOOGLE_CREDENTIALS_JSON")
-google_credentials = None
-if credentials_json:
-    try:
-        google_credentials = json.loads(credentials_json)
-    except json.JSONDecodeError as e:
-        raise ValueError("Invalid JSON in GOOGLE_CREDENTIALS_JSON") from e
+SHEETS_APPEND_CHUNK_ROWS = int(os.environ.get("SHEETS_APPEND_CHUNK_ROWS", "1000"))
+SHEETS_SYNC_VERIFY = os.environ.get("SHEETS_SYNC_VERIFY", "0") == "1"
+
+DATE_COLUMN = "Completed Date"
+
+def _column_letter(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+def _to_cell(value: Any) -> Any:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat(sep=" ")
+    if hasattr(value, "item"):
+        return value.item()
+    return value
 
 class GoogleSheetsTool():
     SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
     API_NAME = "sheets"
     API_VERSION = "v4"
-    TOKEN_PATH = os.path.join(os.path.dirname(__file__), "pickles", "google_sheets_token.pickle")
-    CREDS_FILE = os.path.join(os.path.dirname(__file__), "config", "google_credentials.json")
+    TOKEN_PATH = os.path.join(PICKLES_DIR, "google_sheets_token.pickle")
     SPREADSHEET_ID = "13rWZUjJhB8Dw31kbedqN-B-Rc5fnVeV4"
     SHEET_NAME = "Worksheet"
     
@@ -35,68 +45,82 @@ class GoogleSheetsTool():
     def parse_and_execute(self, output_xlsx_path: str) -> Dict[str, Any]:
         if not output_xlsx_path or not os.path.exists(output_xlsx_path):
             return {"tool": self.get_name(), "action": "update_spreadsheet", "message": f"Local file '{output_xlsx_path}' not found."}
-        
-        latest_online_date = self._get_latest_completed_date_online()
-        if latest_online_date is None:
-            latest_online_date = datetime.min
-        else:
-            latest_online_date = datetime.fromisoformat(latest_online_date)
-        
-        df_local = pd.read_excel(output_xlsx_path)
-        df_local["Completed Date"] = pd.to_datetime(df_local["Completed Date"])
-        new_rows = df_local[df_local["Completed Date"] > latest_online_date]
-        
+
+        sheet_key = f"{self.SPREADSHEET_ID}:{self.SHEET_NAME}"
+        state = get_sheet_sync_state(sheet_key) or {}
+        if SHEETS_SYNC_VERIFY or "high_water_mark" not in state:
+            state = self._verify_high_water_mark(sheet_key)
+        high_water_mark = datetime.fromisoformat(state["high_water_mark"]) if state.get("high_water_mark") else datetime.min
+
+        new_rows = self._collect_new_rows(sheet_key, output_xlsx_path, high_water_mark, state.get("resume_at_mark", False))
         if new_rows.empty:
             return {"tool": self.get_name(), "action": "update_spreadsheet", "message": "No new rows to update."}
-        
-        values = new_rows.values.tolist()
-        update_result = self._append_rows_to_sheet(values)
-        return {"tool": self.get_name(), "action": "update_spreadsheet", "result": update_result, "message": f"Appended {len(values)} new rows."}
 
-    def _get_sheets_service(self):
-        creds = None
-        if os.path.exists(self.TOKEN_PATH):
-            with open(self.TOKEN_PATH, "rb") as token:
-                creds = pickle.load(token)
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
+        results = []
+        for start in range(0, len(new_rows), SHEETS_APPEND_CHUNK_ROWS):
+            chunk = new_rows.iloc[start:start + SHEETS_APPEND_CHUNK_ROWS]
+            values = [[_to_cell(value) for value in row] for row in chunk.drop(columns="_row_hash").itertuples(index=False, name=None)]
+            results.append(self._append_rows_to_sheet(values))
+            # Advance only after the chunk landed, so a failed run resumes from the last appended chunk
+            record_synced_rows(sheet_key, chunk["_row_hash"].tolist(), chunk[DATE_COLUMN].max().isoformat())
+        return {"tool": self.get_name(), "action": "update_spreadsheet", "result": results, "message": f"Appended {len(new_rows)} new rows."}
+
+    def _collect_new_rows(self, sheet_key: str, output_xlsx_path: str, high_water_mark: datetime, resume_at_mark: bool) -> pd.DataFrame:
+        candidates = []
+        for chunk in iter_statement_chunks(output_xlsx_path):
+            chunk[DATE_COLUMN] = pd.to_datetime(chunk[DATE_COLUMN])
+            # A mark we advanced ourselves may split rows sharing its timestamp across chunks, so rows on
+            # it are re-checked against the hash index; a mark read from the sheet is exclusive.
+            if resume_at_mark:
+                recent = chunk[chunk[DATE_COLUMN] >= high_water_mark]
             else:
-                if google_credentials:
-                    flow = InstalledAppFlow.from_client_config(google_credentials, self.SCOPES)
-                else:
-                    flow = InstalledAppFlow.from_client_secrets_file(self.CREDS_FILE, self.SCOPES)
-                creds = flow.run_local_server(port=0)
-            with open(self.TOKEN_PATH, "wb") as token:
-                pickle.dump(creds, token)
-        return build(self.API_NAME, self.API_VERSION, credentials=creds)
-
-    def _get_latest_completed_date_online(self) -> Optional[str]:
+                recent = chunk[chunk[DATE_COLUMN] > high_water_mark]
+            if not recent.empty:
+                candidates.append(recent)
+        if not candidates:
+            return pd.DataFrame()
+
+        rows = pd.concat(candidates)
+        rows["_row_hash"] = [transaction_hash(row) for row in rows.to_dict("records")]
+        rows = rows.drop_duplicates("_row_hash")
+        synced = get_synced_row_hashes(sheet_key, rows["_row_hash"].tolist())
+        rows = rows[~rows["_row_hash"].isin(synced)]
+        return rows.sort_values(DATE_COLUMN, kind="stable")
+
+    def _get_sheets_service(self):
+        return get_google_service(self.API_NAME, self.API_VERSION, self.TOKEN_PATH, self.SCOPES)
+
+    def _verify_high_water_mark(self, sheet_key: str) -> Dict[str, Any]:
+        date_column = self._find_date_column()
+        latest = self._get_latest_completed_date_online(date_column) if date_column else None
+        state = {"date_column": date_column, "high_water_mark": latest, "resume_at_mark": False}
+        set_sheet_sync_state(sheet_key, **state)
+        return state
+
+    def _find_date_column(self) -> Optional[str]:
         service = self._get_sheets_service()
-        range_name = f"{self.SHEET_NAME}!A:Z"
-        result = service.spreadsheets().values().get(spreadsheetId=self.SPREADSHEET_ID, range=range_name).execute()
-        rows = result.get("values", [])
-        if not rows or len(rows) < 2:
-            return None
-        
-        header = rows[0]
+        result = service.spreadsheets().values().get(spreadsheetId=self.SPREADSHEET_ID, range=f"{self.SHEET_NAME}!1:1").execute()
+        header = (result.get("values") or [[]])[0]
         try:
-            col_index = header.index("Completed Date")
+            return _column_letter(header.index(DATE_COLUMN))
         except ValueError:
             return None
-        
-        completed_dates = []
-        for row in rows[1:]:
-            if len(row) > col_index and row[col_index]:
-                try:
-                    dt = datetime.fromisoformat(row[col_index])
-                    completed_dates.append(dt)
-                except Exception:
-                    continue
-        if completed_dates:
-            latest_date = max(completed_dates)
-            return latest_date.isoformat()
-        return None
+
+    def _get_latest_completed_date_online(self, date_column: str) -> Optional[str]:
+        service = self._get_sheets_service()
+        range_name = f"{self.SHEET_NAME}!{date_column}2:{date_column}"
+        result = service.spreadsheets().values().get(
+            spreadsheetId=self.SPREADSHEET_ID,
+            range=range_name,
+            majorDimension="COLUMNS",
+        ).execute()
+        columns = result.get("values", [])
+        if not columns:
+            return None
+        completed_dates = pd.to_datetime(pd.Series(columns[0]), errors="coerce").dropna()
+        if completed_dates.empty:
+            return None
+        return completed_dates.max().isoformat()
 
     def _append_rows_to_sheet(self, values: List[List[Any]]):
         service = self._get_sheets_service()
@@ -106,6 +130,7 @@ class GoogleSheetsTool():
             spreadsheetId=self.SPREADSHEET_ID,
             range=range_name,
             valueInputOption="USER_ENTERED",
+            insertDataOption="INSERT_ROWS",
             body=body
         ).execute()
         return result
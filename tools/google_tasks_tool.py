@@ -1,23 +1,14 @@
+import heapq
 import os
-import pickle
-import json
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from tools.base_tool import BaseTool
-from dotenv import load_dotenv
+from tools.fast_extraction import FastExtraction, find_day, find_time, quoted_after, quoted_strings, to_rfc3339
+from tools.google_auth import PICKLES_DIR, get_google_service
+from tools.google_fanout import fan_out, list_all_pages
 
-load_dotenv()
-
-credentials_json = os.getenv("GOOGLE_CREDENTIALS_JSON")
-google_credentials = None
-if credentials_json:
-    try:
-        google_credentials = json.loads(credentials_json)
-    except json.JSONDecodeError as e:
-        raise ValueError("Invalid JSON in GOOGLE_CREDENTIALS_JSON") from e
+GOOGLE_TASKLIST_IDS = [tid.strip() for tid in os.getenv("GOOGLE_TASKLIST_IDS", "").split(",") if tid.strip()]
 
 class CreateTaskInput(BaseModel):
     title: str = Field(..., description="Title of the task")
@@ -28,8 +19,8 @@ class GoogleTasksTool(BaseTool):
     SCOPES = ["https://www.googleapis.com/auth/tasks"]
     API_NAME = "tasks"
     API_VERSION = "v1"
-    TOKEN_PATH = os.path.join(os.path.dirname(__file__), "pickles", "google_tasks_token.pickle")
-    CREDS_FILE = os.path.join(os.path.dirname(__file__), "config", "google_credentials.json")
+    TOKEN_PATH = os.path.join(PICKLES_DIR, "google_tasks_token.pickle")
+    extraction_model = CreateTaskInput
 
     def get_name(self) -> str:
         return "tasks_tool"
@@ -53,8 +44,38 @@ class GoogleTasksTool(BaseTool):
             "No extra text."
         )
 
+    def _fast_extract(self, user_text: str, intent: str = "") -> Optional[FastExtraction]:
+        notes = quoted_after(user_text, "notes?")
+        if notes is None:
+            match = re.search(r"\bnotes?:\s*([^,.]+)", user_text, re.IGNORECASE)
+            notes = match.group(1).strip() if match else None
+
+        title = quoted_after(user_text, "titled|called|named|task to|task:|to-do to")
+        if title is None:
+            remaining = [text for text in quoted_strings(user_text) if text != notes]
+            if len(remaining) == 1:
+                title = remaining[0]
+        if title is None:
+            match = re.search(r"\b(?:task|to-do|todo)\s*(?::|to)\s*([^,.?]+)", user_text, re.IGNORECASE)
+            if match:
+                title = re.split(r"\s+(?:due|by|on|at|next|tomorrow|today)\b", match.group(1), maxsplit=1, flags=re.IGNORECASE)[0].strip()
+        if not title:
+            return None
+
+        params: Dict[str, Any] = {"title": title}
+        if notes:
+            params["notes"] = notes
+        match = re.search(r"\bdue:?\s*([^,.]+)", user_text, re.IGNORECASE)
+        due_text = match.group(1) if match else " ".join(part for part in (find_day(user_text), find_time(user_text)) if part)
+        if due_text:
+            due = to_rfc3339(due_text)
+            if due is None:
+                return FastExtraction(params=params, confidence=0.3)
+            params["due"] = due
+        return FastExtraction(params=params, confidence=0.9)
+
     def _create_task_flow(self, user_text: str) -> Dict[str, Any]:
-        tool_args = self._extract_params_via_llm(user_text)
+        tool_args = self._extract_params(user_text)
         if "error" in tool_args:
             return {"tool": self.get_name(), "action": "create_task", "message": f"LLM extraction error: {tool_args['error']}"}
         try:
@@ -77,25 +98,26 @@ class GoogleTasksTool(BaseTool):
             body["due"] = task_input.due
         return service.tasks().insert(tasklist="@default", body=body).execute()
 
-    def _list_tasks(self):
+    def _list_tasks(self) -> List[Dict[str, Any]]:
+        tasklist_ids = self._get_tasklist_ids(self._get_tasks_service())
+        return list(heapq.merge(*fan_out(self._list_tasks_in_list, tasklist_ids), key=self._task_sort_key))
+
+    def _get_tasklist_ids(self, service) -> List[str]:
+        if GOOGLE_TASKLIST_IDS:
+            return GOOGLE_TASKLIST_IDS
+        tasklists = list_all_pages(service.tasklists().list, {"maxResults": 100})
+        return [tasklist["id"] for tasklist in tasklists] or ["@default"]
+
+    def _list_tasks_in_list(self, tasklist_id: str) -> List[Dict[str, Any]]:
         service = self._get_tasks_service()
-        response = service.tasks().list(tasklist="@default").execute()
-        return response.get("items", [])
+        tasks = list_all_pages(service.tasks().list, {"tasklist": tasklist_id, "maxResults": 100})
+        for task in tasks:
+            task["tasklist"] = tasklist_id
+        return sorted(tasks, key=self._task_sort_key)
+
+    @staticmethod
+    def _task_sort_key(task: Dict[str, Any]):
+        return (task.get("due") is None, task.get("due") or "", task.get("title", "").lower())
 
     def _get_tasks_service(self):
-        creds = None
-        if os.path.exists(self.TOKEN_PATH):
-            with open(self.TOKEN_PATH, "rb") as token:
-                creds = pickle.load(token)
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                if google_credentials:
-                    flow = InstalledAppFlow.from_client_config(google_credentials, self.SCOPES)
-                else:
-                    flow = InstalledAppFlow.from_client_secrets_file(self.CREDS_FILE, self.SCOPES)
-                creds = flow.run_local_server(port=0)
-            with open(self.TOKEN_PATH, "wb") as token:
-                pickle.dump(creds, token)
-        return build(self.API_NAME, self.API_VERSION, credentials=creds)
+        return get_google_service(self.API_NAME, self.API_VERSION, self.TOKEN_PATH, self.SCOPES)
@@ -1,9 +1,20 @@
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict
 from tools.base_tool import BaseTool
 import pandas as pd
-from transformers import pipeline
 from tools.google_sheets_tool import GoogleSheetsTool
+from tools.statement_io import MultiFormatWriter, iter_statement_chunks
+from tools.transaction_categoriser import get_transaction_categoriser
+from db.transaction_ledger import get_processed_transactions, record_processed_transactions, transaction_hash
+
+INPUT_FILES_DIR = os.path.join(os.path.dirname(__file__), "input_files")
+REVOLUT_INPUT_PATH = os.environ.get("REVOLUT_INPUT_PATH", os.path.join(INPUT_FILES_DIR, "latest.xlsx"))
+REVOLUT_OUTPUT_FORMATS = [fmt.strip() for fmt in os.environ.get("REVOLUT_OUTPUT_FORMATS", "xlsx,csv,txt").split(",") if fmt.strip()]
+OUTPUT_PATHS = {
+    "xlsx": os.path.join(INPUT_FILES_DIR, "new.xlsx"),
+    "csv": os.path.join(INPUT_FILES_DIR, "new1.csv"),
+    "txt": os.path.join(INPUT_FILES_DIR, "new2.txt"),
+}
 
 class RevolutTool(BaseTool):
     def get_name(self) -> str:
@@ -32,33 +43,29 @@ class RevolutTool(BaseTool):
         return self._update_transactions_flow()
 
     def _update_transactions_flow(self) -> Dict[str, Any]:
-        transactions = self._get_transactions_from_xlsx()
-        
-        output_xlsx_path = os.path.join(os.path.dirname(__file__), "input_files", "new.xlsx")
-        pd.DataFrame(transactions).to_excel(output_xlsx_path, index=False)
-        pd.DataFrame(transactions).to_csv(os.path.join(os.path.dirname(__file__), "input_files", "new1.csv"), index=False)
-        pd.DataFrame(transactions).to_string(os.path.join(os.path.dirname(__file__), "input_files", "new2.txt"), index=False)
-                
-        return {"tool": self.get_name(), "action": "update_transactions", "message": f"Updated transactions in '{output_xlsx_path}'."}
-    
-    def _get_grouping(self, description: str, txn_type: str) -> str:
-        classifier_model = pipeline("text-classification", model="kuro-08/bert-transaction-categorization")
-        description = str(description)
-        txn_type = str(txn_type)
-        
-        if description.upper().startswith("APPLE PAY TOP"):
-            return "Salary"
-        elif description.upper().startswith("TO EUR"):
-            return "SKIP"
-        elif txn_type.upper() == "TRANSFER":
-            return "Friends & Family"
-        
-        result = classifier_model(description)
-        return result[0]["label"]
+        outputs = {fmt: OUTPUT_PATHS[fmt] for fmt in REVOLUT_OUTPUT_FORMATS}
+        with MultiFormatWriter(outputs) as writer:
+            for chunk in iter_statement_chunks(REVOLUT_INPUT_PATH):
+                writer.write(self._categorise_chunk(chunk))
+
+        output_xlsx_path = outputs.get("xlsx", next(iter(outputs.values()), ""))
+        return {
+            "tool": self.get_name(),
+            "action": "update_transactions",
+            "message": f"Updated {writer.rows_written} transactions in '{output_xlsx_path}'.",
+        }
 
-    def _get_transactions_from_xlsx(self) -> List[Dict[str, Any]]:
-        INPUT_SHEET = os.path.join(os.path.dirname(__file__), "input_files", "latest.xlsx")
-        df = pd.read_excel(INPUT_SHEET)
-        df.columns = df.columns.str.strip()
+    def _categorise_chunk(self, df: pd.DataFrame) -> pd.DataFrame:
+        hashes = pd.Series([transaction_hash(row) for row in df.to_dict("records")], index=df.index)
+        processed = get_processed_transactions(hashes.unique().tolist())
+        df["Category"] = hashes.map(processed)
 
-        df["Category"] = df.apply(lambda row: self._get_grouping(row["Description"], row["Type"]), axis=1)
+        new_rows = df["Category"].isna()
+        if new_rows.any():
+            categorised = get_transaction_categoriser().categorise(df[new_rows])
+            df.loc[new_rows, "Category"] = categorised["Category"]
+            record_processed_transactions({
+                txn_hash: (category, merchant_key)
+                for txn_hash, category, merchant_key in zip(hashes[new_rows], categorised["Category"], categorised["Merchant Key"])
+            })
+        return df
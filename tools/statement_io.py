@@ -0,0 +1,147 @@
+import csv
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+STATEMENT_CHUNK_SIZE = int(os.environ.get("STATEMENT_CHUNK_SIZE", "5000"))
+
+def iter_statement_chunks(path: str, chunk_size: int = STATEMENT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    if path.lower().endswith(".csv"):
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            chunk.columns = chunk.columns.str.strip()
+            yield chunk
+        return
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name).strip() if name is not None else "" for name in header]
+        batch: List[tuple] = []
+        start = 0
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield _to_frame(batch, columns, start)
+                start += len(batch)
+                batch = []
+        if batch:
+            yield _to_frame(batch, columns, start)
+    finally:
+        workbook.close()
+
+def _to_frame(rows: List[tuple], columns: List[str], start: int) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    df.index = pd.RangeIndex(start, start + len(df))
+    return df
+
+class StatementWriter(ABC):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._header_written = False
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+class XlsxStatementWriter(StatementWriter):
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet()
+
+    def write(self, df: pd.DataFrame) -> None:
+        if not self._header_written:
+            self._sheet.append(list(df.columns))
+            self._header_written = True
+        for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+            self._sheet.append(list(row))
+
+    def close(self) -> None:
+        if not self._header_written:
+            self._sheet.append([])
+        self._workbook.save(self.path)
+
+class CsvStatementWriter(StatementWriter):
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._handle = open(path, "w", newline="", encoding="utf-8")
+
+    def write(self, df: pd.DataFrame) -> None:
+        df.to_csv(self._handle, header=not self._header_written, index=False, quoting=csv.QUOTE_MINIMAL)
+        self._header_written = True
+
+    def close(self) -> None:
+        self._handle.close()
+
+class TxtStatementWriter(StatementWriter):
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self._handle = open(path, "w", encoding="utf-8")
+        self._widths: Optional[List[int]] = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        rows = [
+            ["NaN" if pd.isna(value) else str(value) for value in row]
+            for row in df.astype(object).itertuples(index=False, name=None)
+        ]
+        if self._widths is None:
+            # Widths come from the header and the first chunk and hold for the whole file;
+            # a longer value in a later chunk widens only its own cell.
+            header = [str(name) for name in df.columns]
+            self._widths = [max([len(name)] + [len(row[i]) for row in rows]) for i, name in enumerate(header)]
+            self._write_line(header)
+            self._header_written = True
+        for row in rows:
+            self._write_line(row)
+
+    def _write_line(self, cells: List[str]) -> None:
+        self._handle.write(" ".join(cell.rjust(width) for cell, width in zip(cells, self._widths)) + "\n")
+
+    def close(self) -> None:
+        self._handle.close()
+
+STATEMENT_WRITERS = {
+    "xlsx": XlsxStatementWriter,
+    "csv": CsvStatementWriter,
+    "txt": TxtStatementWriter,
+}
+
+class MultiFormatWriter:
+    def __init__(self, paths: Dict[str, str]) -> None:
+        unknown = set(paths) - set(STATEMENT_WRITERS)
+        if unknown:
+            raise ValueError(f"Unsupported statement output formats: {sorted(unknown)}")
+        self.writers = {fmt: STATEMENT_WRITERS[fmt](path) for fmt, path in paths.items()}
+        self.rows_written = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        for writer in self.writers.values():
+            writer.write(df)
+        self.rows_written += len(df)
+
+    def close(self) -> None:
+        error: Optional[Exception] = None
+        for writer in self.writers.values():
+            try:
+                writer.close()
+            except Exception as e:
+                error = error or e
+        if error:
+            raise error
+
+    def __enter__(self) -> "MultiFormatWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,171 @@
+import contextvars
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, List, Optional, Sequence
+
+SUMMARY_TOKEN_BUDGET = int(os.environ.get("SUMMARY_TOKEN_BUDGET", "2000"))
+SUMMARY_TIME_BUDGET = float(os.environ.get("SUMMARY_TIME_BUDGET", "20"))
+SUMMARY_MAX_CHUNKS = int(os.environ.get("SUMMARY_MAX_CHUNKS", "8"))
+SUMMARY_MAX_FIELD_CHARS = int(os.environ.get("SUMMARY_MAX_FIELD_CHARS", "1000"))
+SUMMARY_WORKERS = int(os.environ.get("SUMMARY_WORKERS", "4"))
+SUMMARY_EXTRACTIVE_CHARS = int(os.environ.get("SUMMARY_EXTRACTIVE_CHARS", "400"))
+SUMMARY_NUM_PREDICT = int(os.environ.get("SUMMARY_NUM_PREDICT", "256"))
+
+CHARS_PER_TOKEN = 4
+
+# Returns the summary text for a full prompt, or None when the model gave nothing
+# usable. The second argument is the seconds left: the call must give up by then.
+Completion = Callable[[str, float], Optional[str]]
+
+_executor = ThreadPoolExecutor(max_workers=SUMMARY_WORKERS, thread_name_prefix="summarizer")
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def project(data: Any, fields: Optional[Sequence[str]] = None, max_chars: int = SUMMARY_MAX_FIELD_CHARS) -> Any:
+    if isinstance(data, dict):
+        keys = [key for key in fields if key in data] if fields else list(data)
+        return {key: project(data[key], None, max_chars) for key in keys}
+    if isinstance(data, (list, tuple)):
+        return [project(item, fields, max_chars) for item in data]
+    if isinstance(data, str) and len(data) > max_chars:
+        return data[:max_chars] + "…"
+    return data
+
+def _serialise(data: Any) -> str:
+    return data if isinstance(data, str) else json.dumps(data, ensure_ascii=False, default=str)
+
+def chunk_items(items: List[Any], token_budget: int) -> List[List[Any]]:
+    chunks: List[List[Any]] = []
+    current: List[Any] = []
+    current_tokens = 0
+    for item in items:
+        item_tokens = estimate_tokens(_serialise(item))
+        if current and current_tokens + item_tokens > token_budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += item_tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _split_text(text: str, token_budget: int) -> List[str]:
+    size = token_budget * CHARS_PER_TOKEN
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+def _text_of(item: Any) -> str:
+    if isinstance(item, dict):
+        return " - ".join(str(value) for value in item.values() if isinstance(value, str) and value)
+    return str(item)
+
+def extractive_summary(items: List[Any], max_chars: int = SUMMARY_EXTRACTIVE_CHARS) -> str:
+    parts: List[str] = []
+    used = 0
+    for item in items:
+        text = " ".join(_text_of(item).split())
+        sentence = text.split(". ")[0].rstrip(".")
+        if not sentence:
+            continue
+        if used + len(sentence) > max_chars:
+            if not parts:
+                parts.append(sentence[:max_chars].rstrip() + "…")
+            break
+        parts.append(sentence)
+        used += len(sentence) + 2
+    return ". ".join(parts) + "." if parts else "Nothing to summarise."
+
+class Summarizer:
+    def __init__(
+        self,
+        token_budget: int = SUMMARY_TOKEN_BUDGET,
+        time_budget: float = SUMMARY_TIME_BUDGET,
+        max_chunks: int = SUMMARY_MAX_CHUNKS,
+    ) -> None:
+        self.token_budget = token_budget
+        self.time_budget = time_budget
+        self.max_chunks = max_chunks
+
+    def summarize(
+        self,
+        data: Any,
+        summary_prompt: str,
+        complete: Completion,
+        final_complete: Optional[Completion] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> str:
+        deadline = time.monotonic() + self.time_budget
+        final_complete = final_complete or complete
+        projected = project(data, fields)
+        items = projected if isinstance(projected, list) else None
+        text = _serialise(projected)
+
+        if estimate_tokens(text) <= self.token_budget:
+            summary = self._run(final_complete, f"{summary_prompt}\n\nData: {text}", deadline)
+            return summary or extractive_summary(items if items is not None else [text])
+
+        if items is not None:
+            chunks = [_serialise(chunk) for chunk in chunk_items(items, self.token_budget)]
+        else:
+            chunks = _split_text(text, self.token_budget)
+        if len(chunks) > self.max_chunks:
+            logging.info(f"Summarising the first {self.max_chunks} of {len(chunks)} chunks")
+            chunks = chunks[:self.max_chunks]
+
+        partials = self._map(complete, summary_prompt, chunks, deadline)
+        if not partials:
+            return extractive_summary(items if items is not None else chunks)
+        if len(partials) == 1:
+            return partials[0]
+        reduce_prompt = f"{summary_prompt}\n\nThese are summaries of consecutive parts of the data; combine them.\n\nData: {_serialise(partials)}"
+        return self._run(final_complete, reduce_prompt, deadline) or " ".join(partials)
+
+    def _map(self, complete: Completion, summary_prompt: str, chunks: List[str], deadline: float) -> List[str]:
+        # Leave part of the budget for the reduce call. Each call gets the map
+        # budget as its own timeout, so a late chunk stops instead of holding a
+        # pool worker and an LLM slot after the request has moved on.
+        map_deadline = deadline - self.time_budget / 4
+        futures = [
+            _executor.submit(
+                contextvars.copy_context().run,
+                complete,
+                f"{summary_prompt}\n\nData: {chunk}",
+                max(0.0, map_deadline - time.monotonic()),
+            )
+            for chunk in chunks
+        ]
+        pending = set(futures)
+        while pending:
+            remaining = map_deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in pending:
+            future.cancel()
+
+        partials = []
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None and future.result():
+                partials.append(future.result())
+        if pending:
+            logging.warning(f"{len(pending)} of {len(chunks)} summary chunks missed the time budget")
+        return partials
+
+    def _run(self, complete: Completion, prompt: str, deadline: float) -> Optional[str]:
+        # Runs on the caller's thread: only the map phase needs the pool. The
+        # call itself is bounded by the time left.
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logging.warning("Summary time budget spent, falling back to an extractive summary")
+            return None
+        try:
+            return complete(prompt, remaining)
+        except Exception as e:
+            logging.warning(f"Summary call failed: {e}")
+        return None
+
+summarizer = Summarizer()
@@ -1,22 +1,137 @@
-from typing import List
+import importlib
+import threading
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
 from tools.base_tool import BaseTool
-from tools.google_calendar_tool import GoogleCalendarTool
-from tools.google_tasks_tool import GoogleTasksTool
-from tools.gmail_tool import GmailTool
-from tools.web_search_tool import WebSearchTool
-from tools.revolut_tool import RevolutTool
 
-def get_all_tools() -> List[BaseTool]:
-    return [
-            GoogleCalendarTool(), 
-            GoogleTasksTool(), 
-            GmailTool(), 
-            # RevolutTool(),
-            WebSearchTool()
-        ]
+class ToolManifest(BaseModel):
+    name: str
+    module: str
+    class_name: str
+    intents: List[str]
+    scopes: List[str] = Field(default_factory=list)
+    heavy_dependencies: List[str] = Field(default_factory=list)
+    enabled: bool = True
+
+TOOL_MANIFESTS = [
+    ToolManifest(
+        name="calendar_tool",
+        module="tools.google_calendar_tool",
+        class_name="GoogleCalendarTool",
+        intents=["create calendar event", "list calendar events"],
+        scopes=["https://www.googleapis.com/auth/calendar"],
+        heavy_dependencies=["googleapiclient", "dateparser"],
+    ),
+    ToolManifest(
+        name="tasks_tool",
+        module="tools.google_tasks_tool",
+        class_name="GoogleTasksTool",
+        intents=["create task", "list tasks"],
+        scopes=["https://www.googleapis.com/auth/tasks"],
+        heavy_dependencies=["googleapiclient"],
+    ),
+    ToolManifest(
+        name="gmail_tool",
+        module="tools.gmail_tool",
+        class_name="GmailTool",
+        intents=["check email", "list emails", "read emails"],
+        scopes=["https://www.googleapis.com/auth/gmail.readonly"],
+        heavy_dependencies=["googleapiclient"],
+    ),
+    ToolManifest(
+        name="revolut_tool",
+        module="tools.revolut_tool",
+        class_name="RevolutTool",
+        intents=["update transactions"],
+        scopes=["https://www.googleapis.com/auth/spreadsheets"],
+        heavy_dependencies=["pandas", "transformers"],
+        enabled=False,
+    ),
+    ToolManifest(
+        name="websearch_tool",
+        module="tools.web_search_tool",
+        class_name="WebSearchTool",
+        intents=["web search", "unknown"],
+        heavy_dependencies=["requests"],
+    ),
+]
 
-def find_tool_for_intent(intent: str) -> BaseTool:
-    for tool in get_all_tools():
-        if tool.can_handle_intent(intent):
+class ToolRegistry:
+    def __init__(self, manifests: List[ToolManifest]) -> None:
+        self._manifests: Dict[str, ToolManifest] = {}
+        self._tools: Dict[str, BaseTool] = {}
+        self._intent_index: Dict[str, str] = {}
+        self._load_lock = threading.Lock()
+        for manifest in manifests:
+            self.register(manifest)
+
+    def register(self, manifest: ToolManifest) -> None:
+        if manifest.name in self._manifests:
+            raise ValueError(f"Tool '{manifest.name}' is already registered.")
+        self._manifests[manifest.name] = manifest
+        if not manifest.enabled:
+            return
+        for intent in manifest.intents:
+            owner = self._intent_index.get(intent)
+            if owner:
+                raise ValueError(f"Intent '{intent}' is claimed by both '{owner}' and '{manifest.name}'.")
+        for intent in manifest.intents:
+            self._intent_index[intent] = manifest.name
+
+    def _get_tool(self, name: str) -> BaseTool:
+        tool = self._tools.get(name)
+        if tool is not None:
             return tool
-    return None
+        with self._load_lock:
+            tool = self._tools.get(name)
+            if tool is None:
+                manifest = self._manifests[name]
+                tool_class = getattr(importlib.import_module(manifest.module), manifest.class_name)
+                tool = tool_class()
+                for intent in manifest.intents:
+                    if not tool.can_handle_intent(intent):
+                        raise ValueError(f"Tool '{name}' declares intent '{intent}' but cannot handle it.")
+                self._tools[name] = tool
+        return tool
+
+    def find_tool_for_intent(self, intent: str) -> Optional[BaseTool]:
+        name = self._intent_index.get(intent)
+        return self._get_tool(name) if name else None
+
+    def get_all_tools(self) -> List[BaseTool]:
+        return [self._get_tool(name) for name, manifest in self._manifests.items() if manifest.enabled]
+
+    def intent_owners(self) -> Dict[str, str]:
+        return dict(self._intent_index)
+
+    def describe(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": manifest.name,
+                "intents": manifest.intents,
+                "scopes": manifest.scopes,
+                "heavy_dependencies": manifest.heavy_dependencies,
+                "enabled": manifest.enabled,
+                "loaded": manifest.name in self._tools,
+            }
+            for manifest in self._manifests.values()
+        ]
+
+_registry: Optional[ToolRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_registry() -> ToolRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ToolRegistry(TOOL_MANIFESTS)
+    return _registry
+
+def get_all_tools() -> List[BaseTool]:
+    return get_registry().get_all_tools()
+
+def find_tool_for_intent(intent: str) -> Optional[BaseTool]:
+    return get_registry().find_tool_for_intent(intent)
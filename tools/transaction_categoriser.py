@@ -0,0 +1,103 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ai.model_status import track_model_load
+from db.merchant_categories import get_merchant_categories, set_merchant_categories
+
+TRANSACTION_CATEGORY_MODEL = os.environ.get("TRANSACTION_CATEGORY_MODEL", "kuro-08/bert-transaction-categorization")
+TRANSACTION_BATCH_SIZE = int(os.environ.get("TRANSACTION_BATCH_SIZE", "32"))
+
+class TransactionCategoriser:
+    def __init__(
+        self,
+        model_name: str = TRANSACTION_CATEGORY_MODEL,
+        batch_size: int = TRANSACTION_BATCH_SIZE,
+        use_cache: bool = True,
+    ) -> None:
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.use_cache = use_cache
+        self._pipeline = None
+        self._pipeline_lock = threading.Lock()
+
+    def _get_pipeline(self):
+        if self._pipeline is None:
+            with self._pipeline_lock:
+                if self._pipeline is None:
+                    from transformers import pipeline
+
+                    with track_model_load(f"transactions:{self.model_name}", gates_readiness=False):
+                        self._pipeline = pipeline("text-classification", model=self.model_name)
+        return self._pipeline
+
+    def classify(self, descriptions: List[str]) -> Dict[str, Tuple[str, float]]:
+        if not descriptions:
+            return {}
+        results = self._get_pipeline()(descriptions, batch_size=self.batch_size, truncation=True)
+        return {description: (result["label"], float(result["score"])) for description, result in zip(descriptions, results)}
+
+    @staticmethod
+    def merchant_keys(descriptions: pd.Series) -> pd.Series:
+        # Vectorised equivalent of db.merchant_categories.normalise_description
+        return (
+            descriptions.astype(str)
+            .str.upper()
+            .str.replace(r"[^A-Z ]+", " ", regex=True)
+            .str.replace(r"\s+", " ", regex=True)
+            .str.strip()
+        )
+
+    def categorise(self, df: pd.DataFrame) -> pd.DataFrame:
+        descriptions = df["Description"].astype(str)
+        upper = descriptions.str.upper()
+        txn_types = df["Type"].astype(str).str.upper()
+        merchant_keys = self.merchant_keys(descriptions)
+        cached = get_merchant_categories(merchant_keys.unique().tolist()) if self.use_cache else {}
+
+        categories = pd.Series(None, index=df.index, dtype=object)
+        confidences = pd.Series(1.0, index=df.index, dtype=float)
+
+        overrides = {key: doc["category"] for key, doc in cached.items() if doc.get("source") == "user"}
+        user = merchant_keys.isin(list(overrides))
+        categories[user] = merchant_keys[user].map(overrides)
+
+        salary = upper.str.startswith("APPLE PAY TOP") & ~user
+        skip = upper.str.startswith("TO EUR") & ~salary & ~user
+        transfer = (txn_types == "TRANSFER") & ~salary & ~skip & ~user
+        categories[salary] = "Salary"
+        categories[skip] = "SKIP"
+        categories[transfer] = "Friends & Family"
+
+        remaining = categories.isna()
+        known = remaining & merchant_keys.isin(list(cached))
+        if known.any():
+            categories[known] = merchant_keys[known].map(lambda key: cached[key]["category"])
+            confidences[known] = merchant_keys[known].map(lambda key: cached[key].get("confidence", 1.0))
+
+        remaining = categories.isna()
+        if remaining.any():
+            representatives = descriptions[remaining].groupby(merchant_keys[remaining]).first()
+            predictions = self.classify(representatives.tolist())
+            by_key = {key: predictions[description] for key, description in representatives.items()}
+            categories[remaining] = merchant_keys[remaining].map(lambda key: by_key[key][0])
+            confidences[remaining] = merchant_keys[remaining].map(lambda key: by_key[key][1])
+            if self.use_cache:
+                set_merchant_categories(by_key)
+        return pd.DataFrame(
+            {"Category": categories, "Confidence": confidences, "Merchant Key": merchant_keys},
+            index=df.index,
+        )
+
+_categoriser: Optional[TransactionCategoriser] = None
+_categoriser_lock = threading.Lock()
+
+def get_transaction_categoriser() -> TransactionCategoriser:
+    global _categoriser
+    if _categoriser is None:
+        with _categoriser_lock:
+            if _categoriser is None:
+                _categoriser = TransactionCategoriser()
+    return _categoriser
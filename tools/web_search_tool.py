@@ -5,12 +5,14 @@ import requests
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
+from ai.timings import timed
 from tools.base_tool import BaseTool
 
 load_dotenv()
 
 GOOGLE_SEARCH_API_KEY = os.getenv("GOOGLE_SEARCH_API_KEY")
 GOOGLE_SEARCH_ENGINE_ID = os.getenv("GOOGLE_SEARCH_ENGINE_ID")
+GOOGLE_SEARCH_URL = os.getenv("GOOGLE_SEARCH_URL", "https://www.googleapis.com/customsearch/v1")
 
 
 class WebSearchInput(BaseModel):
@@ -18,6 +20,9 @@ class WebSearchInput(BaseModel):
 
 
 class WebSearchTool(BaseTool):
+    summary_fields = ["title", "snippet"]
+    extraction_model = WebSearchInput
+
     def get_name(self) -> str:
         return "websearch_tool"
 
@@ -55,7 +60,6 @@ class WebSearchTool(BaseTool):
         }
 
     def _perform_google_search(self, query: str) -> List[Dict[str, Any]]:
-        url = "https://www.googleapis.com/customsearch/v1"
         params = {
             "key": GOOGLE_SEARCH_API_KEY,
             "cx": GOOGLE_SEARCH_ENGINE_ID,
@@ -63,7 +67,8 @@ class WebSearchTool(BaseTool):
             "num": 1,
         }
         try:
-            response = requests.get(url, params=params)
+            with timed("search"):
+                response = requests.get(GOOGLE_SEARCH_URL, params=params)
             response.raise_for_status()
             data = response.json()
             return [